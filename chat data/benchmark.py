@@ -0,0 +1,170 @@
+import importlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from synthetic import MEDIA_TYPES, generate
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCH_DIR = os.path.join(SCRIPT_DIR, 'bench')
+RESULTS_FILE = os.path.join(SCRIPT_DIR, 'benchmark_results.jsonl')
+
+# Libraries the media stage imports for these types; types whose library
+# isn't installed are left out of the synthetic export
+MEDIA_LIBRARIES = {'pdf': 'fitz', 'docx': 'docx'}
+
+# Each stage is one of the pipeline scripts, run as it is run by hand, with
+# the files it produces (relative to the work directory)
+STAGES = [
+    ("group", "group_by_company.py", ["grouped_messages.json", "message_occurrences.json"]),
+    ("extract", "extract_data.py", ["placement_data.json"]),
+    ("media", "process_media.py", ["../backend/data", "../frontend/src/data", "../frontend/public/messages"]),
+]
+
+
+def output_size(workdir, paths):
+    total = 0
+    for path in paths:
+        path = os.path.join(workdir, path)
+        if os.path.isdir(path):
+            total += sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+        elif os.path.exists(path):
+            total += os.path.getsize(path)
+    return total
+
+
+# Linux carries the peak RSS of the process that forked a child over into the
+# child's own figure, so stages are started from this small launcher rather
+# than from the benchmark process. wait4 includes the stage's worker processes.
+LAUNCHER = """
+import json, os, subprocess, sys
+proc = subprocess.Popen(sys.argv[1:], stdout=subprocess.DEVNULL)
+_, status, usage = os.wait4(proc.pid, 0)
+print(json.dumps([os.waitstatus_to_exitcode(status), usage.ru_utime + usage.ru_stime, usage.ru_maxrss]))
+"""
+
+
+def run_stage(script, workdir):
+    """Run a pipeline script in `workdir`; returns (ok, seconds, cpu seconds, peak RSS in MB)."""
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-c', LAUNCHER, sys.executable, os.path.join(SCRIPT_DIR, script)],
+                          cwd=workdir, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    code, cpu, maxrss = json.loads(proc.stdout)
+    if code:
+        print(proc.stderr.strip().splitlines()[-1], file=sys.stderr)
+    return code == 0, elapsed, cpu, maxrss / 1024
+
+
+def run_pipeline(workdir, messages):
+    stages = {}
+    for name, script, outputs in STAGES:
+        ok, elapsed, cpu, rss = run_stage(script, workdir)
+        stages[name] = {
+            "ok": ok,
+            "seconds": round(elapsed, 3),
+            "cpu_seconds": round(cpu, 3),
+            "peak_rss_mb": round(rss, 1),
+            "messages_per_sec": round(messages / elapsed, 1) if elapsed else None,
+            "output_bytes": output_size(workdir, outputs),
+        }
+        if not ok:
+            break
+        if name == "extract":
+            # process_media picks the placement data up from the backend
+            shutil.copy(os.path.join(workdir, 'placement_data.json'),
+                        os.path.join(workdir, '../backend/data/placement_data.json'))
+    return stages
+
+
+def available_media_types(types=MEDIA_TYPES):
+    available = []
+    for kind in types:
+        library = MEDIA_LIBRARIES.get(kind)
+        if library:
+            try:
+                importlib.import_module(library)
+            except ImportError:
+                print(f"Skipping {kind} media: {library} can't be imported", file=sys.stderr)
+                continue
+        available.append(kind)
+    return available
+
+
+def prepare(scale, media_types):
+    # Same layout as the repo, so the scripts' relative paths work unchanged
+    root = os.path.join(BENCH_DIR, f'x{scale}')
+    shutil.rmtree(root, ignore_errors=True)
+    workdir = os.path.join(root, 'chat data')
+    for path in ['backend/data', 'frontend/src/data', 'frontend/public/messages']:
+        os.makedirs(os.path.join(root, path))
+    messages, media = generate(workdir, scale, media_types=media_types)
+    return workdir, messages, media
+
+
+def commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPT_DIR,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def load_results():
+    if not os.path.exists(RESULTS_FILE):
+        return []
+    with open(RESULTS_FILE, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def report(run, previous):
+    print(f"x{run['scale']} {run['pass']}: {run['messages']} messages, {run['media_files']} media files")
+    for name, stage in run["stages"].items():
+        line = (f"  {name:8} {stage['seconds']:8.2f}s  {stage['messages_per_sec'] or 0:10.0f} msg/s  "
+                f"{stage['peak_rss_mb']:7.1f} MB  {stage['output_bytes']:>12} B")
+        before = (previous or {}).get("stages", {}).get(name)
+        if before and before["ok"] and before["seconds"]:
+            line += f"  ({(stage['seconds'] - before['seconds']) / before['seconds']:+.0%} vs {previous['commit'] or previous['time']})"
+        if not stage["ok"]:
+            line += "  FAILED"
+        print(line)
+
+
+def benchmark(scales):
+    """Run the pipeline over synthetic exports at each scale, cold and then warm.
+
+    Every run is appended to benchmark_results.jsonl and compared with the
+    last stored run at the same scale and pass over the same media types.
+    """
+    history = load_results()
+    stamp = datetime.now().isoformat(timespec='seconds')
+    revision = commit()
+    media_types = available_media_types()
+    for scale in scales:
+        workdir, messages, media = prepare(scale, media_types)
+        # The second pass finds the parse, media and text caches from the first
+        for label in ("cold", "warm"):
+            run = {
+                "time": stamp,
+                "commit": revision,
+                "scale": scale,
+                "pass": label,
+                "messages": messages,
+                "media_files": media,
+                "media_types": media_types,
+                "stages": run_pipeline(workdir, messages),
+            }
+            previous = next((r for r in reversed(history) if r["scale"] == scale and r["pass"] == label
+                             and r.get("media_types", list(MEDIA_TYPES)) == media_types), None)
+            report(run, previous)
+            with open(RESULTS_FILE, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(run) + '\n')
+            history.append(run)
+
+
+if __name__ == "__main__":
+    benchmark([int(s) for s in sys.argv[1:]] or [1, 10])
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import mmap
+import os
+import re
+from datetime import datetime
+
+SEPARATOR = b'\n---'
+INDEX_SUFFIX = '.idx.json'
+
+# '27/09/25, 3:28 pm - ...' (WhatsApp may put a narrow no-break space before am/pm)
+TIMESTAMP_RE = re.compile(rb'\s*(\d{2}/\d{2}/\d{2}), (\d{1,2}:\d{2})(?:\s|\xe2\x80\xaf)?([ap]m)\b')
+
+
+def parse_timestamp(head):
+    m = TIMESTAMP_RE.match(head)
+    if not m:
+        return None
+    stamp = b' '.join(m.groups()).decode('ascii')
+    try:
+        return datetime.strptime(stamp, '%d/%m/%y %I:%M %p').isoformat(timespec='minutes')
+    except ValueError:
+        return None
+
+
+class ChatExport:
+    """Memory-mapped view of a '---' separated chat export.
+
+    Messages are decoded lazily, one at a time, and the byte offsets of the
+    message boundaries (plus each message's timestamp) are kept in a sidecar
+    index so later runs and stages can seek straight to a message. When the
+    export has grown and its last indexed message is unchanged, only the
+    bytes from that message on are indexed again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        # mmap refuses empty files
+        self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self._offsets = None
+
+    def close(self):
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def boundaries(self, start=0):
+        # Same splitting as str.split('\n---'), but on raw bytes, from a
+        # message start onwards
+        buf = self._buf
+        while True:
+            end = buf.find(SEPARATOR, start)
+            if end == -1:
+                yield start, len(buf)
+                return
+            yield start, end
+            start = end + len(SEPARATOR)
+
+    def read(self, start, end):
+        return self._buf[start:end].decode('utf-8')
+
+    def digest(self, start, end):
+        return hashlib.sha1(self._buf[start:end]).hexdigest()
+
+    def __iter__(self):
+        for start, end in self.boundaries():
+            yield self.read(start, end)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, i):
+        start, end, _ = self.offsets[i]
+        return self.read(start, end)
+
+    @property
+    def offsets(self):
+        """[start, end, timestamp] for every message, loaded from or saved to the sidecar index."""
+        if self._offsets is None:
+            self._offsets = self._load_index()
+            if self._offsets is None:
+                self._offsets = self.build_index()
+                self._save_index()
+        return self._offsets
+
+    def build_index(self, start=0):
+        return [[start, end, parse_timestamp(self._buf[start:start + 64])]
+                for start, end in self.boundaries(start)]
+
+    def _source_stamp(self):
+        st = os.stat(self.path)
+        return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        source, messages = self._source_stamp(), index["messages"]
+        if index.get("source") == source:
+            return messages
+        # Appended to: the last message may run on, so it is indexed again
+        # along with everything after it
+        start, end, _ = messages[-1]
+        if source["size"] < index["source"]["size"] or self.digest(start, end) != index.get("tail"):
+            return None
+        self._offsets = messages[:-1] + self.build_index(start)
+        self._save_index()
+        return self._offsets
+
+    def _save_index(self):
+        start, end, _ = self._offsets[-1]
+        index = {"source": self._source_stamp(), "tail": self.digest(start, end), "messages": self._offsets}
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, separators=(',', ':'))
+
+
+def iter_messages(path):
+    """Yield the messages of a chat export one at a time."""
+    with ChatExport(path) as export:
+        yield from export
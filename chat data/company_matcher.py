@@ -0,0 +1,72 @@
+import re
+
+# Characters that count as part of a word when checking match boundaries
+WORD_CHARS = '0-9a-z'
+
+
+def build_trie(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = True
+    return trie
+
+
+def trie_to_regex(node):
+    # Render the trie as nested alternations so the regex engine walks it like
+    # an automaton instead of retrying every alternative at every position.
+    # Longer branches come first, which makes each match the longest one.
+    terminal = '' in node
+    branches = []
+    for ch in sorted(k for k in node if k):
+        branches.append(re.escape(ch) + trie_to_regex(node[ch]))
+    if not branches:
+        return ''
+    if len(branches) == 1 and not terminal:
+        return branches[0]
+    body = '(?:' + '|'.join(branches) + ')'
+    if terminal:
+        body += '?'
+    return body
+
+
+class CompanyMatcher:
+    """Finds every canonical company mentioned in a message in a single scan.
+
+    `companies` are canonical names, `aliases` maps alternative spellings to
+    a canonical name and `exclusions` maps a canonical name to a regex that
+    must not follow a mention (e.g. "Google Forms").
+    """
+
+    def __init__(self, companies, aliases=None, exclusions=None, word_boundary=True):
+        self.companies = list(companies)
+        self.canonical = {}
+        for name in self.companies:
+            self.canonical[name.lower()] = name
+        for alias, name in (aliases or {}).items():
+            self.canonical[alias.lower()] = name
+
+        self.exclusions = {}
+        for name, pattern in (exclusions or {}).items():
+            self.exclusions[name] = re.compile(pattern, re.IGNORECASE)
+
+        body = trie_to_regex(build_trie(self.canonical))
+        if word_boundary:
+            body = f'(?<![{WORD_CHARS}])(?:{body})(?![{WORD_CHARS}])'
+        self.pattern = re.compile(body)
+
+    def match(self, text):
+        """Return the canonical companies mentioned in `text`, in first-mention order."""
+        lowered = text.lower()
+        found = {}
+        for m in self.pattern.finditer(lowered):
+            name = self.canonical[m.group()]
+            if name in found:
+                continue
+            excl = self.exclusions.get(name)
+            if excl and excl.match(lowered, m.end()):
+                continue
+            found[name] = True
+        return list(found)
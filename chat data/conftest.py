@@ -0,0 +1,2 @@
+# test_parse.py is a one-off script over grouped_messages.json, not a test module
+collect_ignore = ["test_parse.py"]
@@ -0,0 +1,132 @@
+import hashlib
+import random
+import re
+
+# Reposts differ in who forwarded them and when, so that header is ignored
+HEADER_RE = re.compile(r'^\s*\d{2}/\d{2}/\d{2}, \d{1,2}:\d{2}\s?(?:am|pm)\s-\s[^:]+:\s*', re.IGNORECASE)
+WORD_RE = re.compile(r'\w+')
+NUMBER_RE = re.compile(r'\d+(?:\.\d+)?')
+
+SHINGLE_SIZE = 5
+BANDS = 8
+ROWS = 4
+MASK = (1 << 61) - 1
+
+_rng = random.Random(0)
+PERMUTATIONS = [(_rng.randrange(1, MASK) | 1, _rng.randrange(MASK)) for _ in range(BANDS * ROWS)]
+
+
+def normalize(text):
+    return ' '.join(WORD_RE.findall(HEADER_RE.sub('', text).lower()))
+
+
+def stable_hash(text):
+    # hash() is salted per process; this keeps LSH candidates the same on every run
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def shingles(words):
+    if len(words) <= SHINGLE_SIZE:
+        return {stable_hash(' '.join(words))}
+    return {stable_hash(' '.join(words[i:i + SHINGLE_SIZE])) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(hashes):
+    return [min((a * h + b) & MASK for h in hashes) for a, b in PERMUTATIONS]
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+class DuplicateIndex:
+    """Groups messages that are the same notice reposted, one message at a time.
+
+    Messages are compared without their timestamp/sender header, case,
+    whitespace or punctuation. Identical ones are grouped by hash; the rest
+    go through MinHash with LSH banding so only likely pairs are compared,
+    and a pair is merged when the Jaccard similarity of their word shingles
+    reaches `threshold`. Messages whose numbers differ (counts, CTCs, dates)
+    are never merged, and neither are messages whose keys differ, e.g. the
+    companies they name. Adding messages one by one gives the same groups as
+    adding them all at once, so a growing export can be grouped as it grows.
+    """
+
+    def __init__(self, threshold=0.8):
+        self.threshold = threshold
+        self.parent = []
+        self.first_seen = {}
+        self.keys = {}
+        self.sets = {}
+        self.numbers = {}
+        self.buckets = {}
+
+    def __len__(self):
+        return len(self.parent)
+
+    def find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, i, j):
+        i, j = self.find(i), self.find(j)
+        if i != j:
+            self.parent[max(i, j)] = min(i, j)
+
+    def add(self, text, key=None):
+        """Add the next message; returns the groups it joined, by their first message.
+
+        A message joining two or more groups merges them into the one that
+        starts first.
+        """
+        i = len(self.parent)
+        self.parent.append(i)
+        joined = set()
+
+        # Exact duplicates after normalization
+        norm = normalize(text)
+        exact = (key, hashlib.sha1(norm.encode('utf-8')).digest())
+        if exact in self.first_seen:
+            joined.add(self.find(self.first_seen[exact]))
+            self.union(self.first_seen[exact], i)
+            return sorted(joined)
+        self.first_seen[exact] = i
+
+        # Near duplicates among the distinct messages before it
+        self.keys[i] = key
+        self.sets[i] = shingles(norm.split())
+        self.numbers[i] = NUMBER_RE.findall(norm)
+        signature = minhash(self.sets[i])
+        candidates = set()
+        for band in range(BANDS):
+            members = self.buckets.setdefault((band, tuple(signature[band * ROWS:(band + 1) * ROWS])), [])
+            candidates.update(members)
+            members.append(i)
+        for j in sorted(candidates):
+            if (self.keys[j] == key and self.numbers[j] == self.numbers[i]
+                    and jaccard(self.sets[j], self.sets[i]) >= self.threshold):
+                joined.add(self.find(j))
+                self.union(j, i)
+        return sorted(joined)
+
+    def groups(self):
+        """Lists of indices, each starting with the group's first message, in order of that message."""
+        groups = {}
+        for i in range(len(self.parent)):
+            groups.setdefault(self.find(i), []).append(i)
+        return [groups[root] for root in sorted(groups)]
+
+
+def find_duplicate_groups(texts, threshold=0.8, keys=None):
+    """Group messages that are the same notice reposted, as DuplicateIndex does.
+
+    Returns lists of indices, each starting with the group's first message
+    in `texts`, in order of that message.
+    """
+    index = DuplicateIndex(threshold)
+    for i, text in enumerate(texts):
+        index.add(text, keys[i] if keys else None)
+    return index.groups()
@@ -1,43 +1,34 @@
 import json
 import re
+import keyword_rules
+import numeric_extractor
+import records
+from keyword_rules import chat_classifier
+from numeric_extractor import scan_numbers, last_by_kind
+from parse_cache import ParseCache
+from profiler import profiler
+from records import Company, OfferProfile, companies_to_dicts
 
-def extract_lpa(text):
-    # Find all mentions of LPA and return the max if multiple, or just the last chronological one.
-    matches = re.findall(r'(\d+(?:\.\d+)?)\s*lpa', text, re.I)
-    if matches:
-        return float(matches[-1])
-    # try looking for "X Lakhs per annum"
-    matches = re.findall(r'inr\s*(\d+(?:\.\d+)?)\s*lakhs\s*per\s*annum', text, re.I)
-    if matches:
-        return float(matches[-1])
-    return None
+def extract_lpa(found):
+    # The last LPA mention wins, else the last "INR X Lakhs per annum"
+    m = found.get('ctc') or found.get('ctc_annum')
+    return m.value if m else None
 
-def extract_stipend(text):
-    matches = re.findall(r'stipend[\s\w]*[:-]?\s*(?:inr|rs\.?)?\s*(\d{2,6})(?:\/-|\s*per month|\s*pm)', text, re.I)
-    if matches:
-        return float(matches[-1])
-    matches = re.findall(r'(\d{2,6})(?:\/-|\s*per month|\s*pm)', text, re.I)
-    if matches:
-        return float(matches[-1])
-    return None
+def extract_stipend(found):
+    # Prefer amounts introduced by "stipend", else any monthly amount
+    m = found.get('stipend') or found.get('monthly')
+    return m.value if m else None
 
-def extract_profiles(messages, name):
+def extract_profiles(messages, name, role_ctcs):
     combined = "\n".join(messages)
     profiles = []
     
-    # Custom scanning logic for multi-roles
-    lines = combined.split('\n')
-    for line in lines:
-        line_lower = line.lower()
-        
-        # Look for pattern: Role Name : Rs. X LPA or Role Name - X LPA
-        # e.g. "Specialist Programmer L3 (Trainee): ₹21 LPA"
-        matches = re.findall(r'([a-zA-Z\s0-9()/-]+?)\s*[:-]?\s*(?:inr|rs\.?|₹)?\s*(\d+(?:\.\d+)?)\s*lpa', line, re.IGNORECASE)
-        for role, ctc in matches:
-            role_clean = role.strip().strip('#').strip('*').strip()
-            # Filter out generic words that aren't roles
-            if len(role_clean) > 3 and not any(x in role_clean.lower() for x in ['package', 'base', 'bonus', 'ctc', 'stipend', 'pay']):
-                profiles.append({"role": role_clean, "ctc_lpa": float(ctc)})
+    # (role, ctc) pairs come from the numeric scan, e.g. "Specialist Programmer L3 (Trainee): ₹21 LPA"
+    for role, ctc in role_ctcs:
+        role_clean = role.strip().strip('#').strip('*').strip()
+        # Filter out generic words that aren't roles
+        if len(role_clean) > 3 and not any(x in role_clean.lower() for x in ['package', 'base', 'bonus', 'ctc', 'stipend', 'pay']):
+            profiles.append({"role": role_clean, "ctc_lpa": ctc})
                 
     # Capgemini exact matches since they are table formatted sometimes
     if name == "Capgemini":
@@ -85,158 +76,152 @@ def extract_profiles(messages, name):
             
     return unique_profiles
 
-def parse_company(name, messages):
-    comp = {
-        "company_name": name,
-        "role": [],
-        "offer_profiles": [],
-        "engagement_type": [],
-        "compensation": {
-            "ctc_lpa": None,
-            "base_lpa": None,
-            "variable_lpa": None,
-            "bonus_lpa": None,
-            "esop_lpa": None,
-            "stipend_monthly": None
-        },
-        "selection_stats": {
-            "students_selected": None,
-            "students_shortlisted": None,
-            "offered_internship": None,
-            "converted_to_ppo": None
-        },
-        "eligibility": {
-            "cgpa_cutoff": None,
-            "allowed_branches": []
-        },
-        "timeline": {
-            "selection_date": None,
-            "internship_duration_months": None
-        },
-        "flags": {
-            "is_result_confirmed": False,
-            "is_withdrawn": False,
-            "data_confidence_score": 0.8
-        },
-        "notes": "",
-        "metadata": {
-            "raw_messages": []
-        }
+def parse_message(msg):
+    # Everything parse_company needs from one message, as plain JSON so it can be cached
+    hits = chat_classifier.classify(msg)
+    numbers = scan_numbers(msg)
+    found = last_by_kind(numbers)
+    
+    def value(kind):
+        return found[kind].value if kind in found else None
+    
+    selects = [m.value for m in numbers if m.kind == 'selected']
+    return {
+        "flags": sorted(hits['flag']),
+        "engagements": sorted(hits['engagement']),
+        "roles": sorted(hits['role']),
+        "branches": sorted(hits['branch']),
+        "selected": sum(selects) if selects else None,
+        "shortlisted": value('shortlisted'),
+        "ctc_lpa": extract_lpa(found),
+        "stipend": extract_stipend(found),
+        "base_lpa": value('base'),
+        "bonus_lpa": value('bonus'),
+        "cgpa": value('cgpa'),
+        "role_ctcs": [[m.label, m.value] for m in numbers if m.kind == 'role'],
     }
+
+def parse_company(name, messages, cache=None):
+    comp = Company(name)
+    stats = comp.selection_stats
+    compensation = comp.compensation
     
     roles = set()
     engagements = set()
     branches = set()
-    
-    combined_text = "\n".join(messages)
+    role_ctcs = []
     
     for msg in messages:
-        text = msg.lower()
+        facts = cache.message(msg, parse_message) if cache else parse_message(msg)
         
         # Flags
-        if 'withdrawn' in text or 'cancelled' in text:
-            comp["flags"]["is_withdrawn"] = True
-        if 'final selects' in text or 'selected candidates' in text or 'final results' in text or 'selected students' in text:
-            comp["flags"]["is_result_confirmed"] = True
+        for flag in facts["flags"]:
+            setattr(comp.flags, flag, True)
             
         # Stats
-        selects = re.findall(r'selection\s+(\d+)', text)
-        if selects:
-            comp["selection_stats"]["students_selected"] = (comp["selection_stats"]["students_selected"] or 0) + sum(int(x) for x in selects)
+        if facts["selected"] is not None:
+            stats.students_selected = (stats.students_selected or 0) + facts["selected"]
         
-        shortlists = re.findall(r'(\d+)\s+shortlisted', text)
-        if shortlists:
-            comp["selection_stats"]["students_shortlisted"] = int(shortlists[-1])
+        if facts["shortlisted"] is not None:
+            stats.students_shortlisted = facts["shortlisted"]
             
         # Compensation
-        ctc = extract_lpa(msg)
-        if ctc:
-            comp["compensation"]["ctc_lpa"] = ctc
+        if facts["ctc_lpa"]:
+            compensation.ctc_lpa = facts["ctc_lpa"]
             
-        stipend = extract_stipend(msg)
+        stipend = facts["stipend"]
         if stipend:
             if stipend < 1000:
                 pass # probably not stipend
             else:
-                comp["compensation"]["stipend_monthly"] = stipend
+                compensation.stipend_monthly = stipend
                 
         # Base/bonus
-        bases = re.findall(r'base\s*(?:package)?\s*[:-]?\s*(?:inr|rs\.?)?\s*(\d+(?:\.\d+)?)\s*lpa', text)
-        if bases:
-            comp["compensation"]["base_lpa"] = float(bases[-1])
-            
-        bonuses = re.findall(r'bonus\s*[:-]?\s*(?:inr|rs\.?)?\s*(\d+(?:\.\d+)?)\s*lpa', text)
-        if bonuses:
-            comp["compensation"]["bonus_lpa"] = float(bonuses[-1])
+        if facts["base_lpa"] is not None:
+            compensation.base_lpa = facts["base_lpa"]
             
-        # Engagements
-        if 'full time' in text or 'fte' in text or 'full-time' in text or 'graduate engineer trainee' in text or 'get' in text:
-            engagements.add("Full Time")
-        if 'intern' in text or 'internship' in text:
-            engagements.add("Internship")
-        if 'ppo' in text:
-            engagements.add("PPO")
+        if facts["bonus_lpa"] is not None:
+            compensation.bonus_lpa = facts["bonus_lpa"]
             
-        # Role
-        if 'software engineer' in text or 'se' in text.split():
-            roles.add('Software Engineer')
-        if 'digital specialist engineer' in text:
-            roles.add('Digital Specialist Engineer')
-        if 'specialist programmer' in text:
-            roles.add('Specialist Programmer')
-        if 'junior support engineer' in text:
-            roles.add('Junior Support Engineer')
-        if 'graduate engineer trainee' in text or 'get' in text.split():
-            roles.add('Graduate Engineer Trainee')
-        if 'system engineer' in text or 'associate system engineer' in text:
-            roles.add('System Engineer')
+        # Engagements and roles
+        engagements.update(facts["engagements"])
+        roles.update(facts["roles"])
+        role_ctcs.extend(facts["role_ctcs"])
             
         # Eligibility
-        cgpas = re.findall(r'(\d+(?:\.\d+)?)\s*cgpa', text)
-        if cgpas:
-            comp['eligibility']["cgpa_cutoff"] = float(cgpas[-1])
+        if facts["cgpa"] is not None:
+            comp.eligibility.cgpa_cutoff = facts["cgpa"]
             
-        if 'cse' in text: branches.add('CSE')
-        if 'it' in text.split(): branches.add('IT')
-        if 'ece' in text: branches.add('ECE')
-        if 'eee' in text: branches.add('EEE')
-        if 'mechanical' in text: branches.add('ME')
-        if 'civil' in text: branches.add('CE')
-            
-        comp["metadata"]["raw_messages"].append(msg.strip())
+        branches.update(facts["branches"])
+        
+    # Grouped messages are already stripped by clean_message, so the record
+    # holds the list itself rather than a copy
+    comp.raw_messages = messages
         
-    comp["offer_profiles"] = extract_profiles(messages, name)
+    comp.offer_profiles = [OfferProfile(p["role"], p["ctc_lpa"]) for p in extract_profiles(messages, name, role_ctcs)]
     
     # Capgemini multiple roles logic: they had A4, A4P, A5
     if name == 'Capgemini':
         roles.update(['Software Engineer A4', 'Software Engineer A4P', 'Senior Software Engineer A5'])
-        comp["compensation"]["ctc_lpa"] = 7.5 # highest
+        compensation.ctc_lpa = 7.5 # highest
         
     # Infosys logic: Fix highest CTC based on parsed roles
     if name == 'Infosys':
-        if comp["offer_profiles"]:
-            highest = max(p["ctc_lpa"] for p in comp["offer_profiles"])
-            comp["compensation"]["ctc_lpa"] = highest
-            roles.update([p["role"] for p in comp["offer_profiles"]])
-        elif not comp["compensation"]["ctc_lpa"]:
-            comp["compensation"]["ctc_lpa"] = 9.5
+        if comp.offer_profiles:
+            highest = max(p.ctc_lpa for p in comp.offer_profiles)
+            compensation.ctc_lpa = highest
+            roles.update([p.role for p in comp.offer_profiles])
+        elif not compensation.ctc_lpa:
+            compensation.ctc_lpa = 9.5
         
-    comp["role"] = list(roles)
-    comp["engagement_type"] = list(engagements)
-    comp["eligibility"]["allowed_branches"] = list(branches)
+    # Sorted, so the same messages always give the same record
+    comp.role = sorted(roles)
+    comp.engagement_type = sorted(engagements)
+    comp.eligibility.allowed_branches = sorted(branches)
     
     return comp
 
-with open('grouped_messages.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+def cached_company(name, messages, cache):
+    # Cached companies are stored without their messages and get the
+    # grouped list back, which their key already vouches for
+    key = cache.company_key(name, messages)
+    parsed = cache.get_company(key)
+    if parsed is not None:
+        return Company.from_dict(parsed, messages)
+    with profiler.section('company', name):
+        company = parse_company(name, messages, cache)
+    cache.put_company(key, company.to_dict(raw_messages=False))
+    return company
+
+def extract_companies(grouped, cache=None):
+    result = {"companies": [], "unresolved_conflicts": []}
+    for comp_name, messages in grouped.items():
+        if cache is None:
+            with profiler.section('company', comp_name):
+                result["companies"].append(parse_company(comp_name, messages))
+        else:
+            result["companies"].append(cached_company(comp_name, messages, cache))
+    return result
+
+def parser_cache(path):
+    # Per-message results are reused across runs; the parser's own source is part
+    # of the cache key so editing a rule or pattern invalidates everything.
+    return ParseCache(path, [__file__, keyword_rules.__file__, numeric_extractor.__file__, records.__file__])
+
+def main():
+    with open('grouped_messages.json', 'r', encoding='utf-8') as f:
+        data = json.load(f)
 
-result = {"companies": [], "unresolved_conflicts": []}
+    cache = parser_cache('parse_cache.json')
+    result = extract_companies(data, cache)
+    cache.save()
 
-for comp_name, messages in data.items():
-    parsed = parse_company(comp_name, messages)
-    result["companies"].append(parsed)
+    with open('placement_data.json', 'w', encoding='utf-8') as f:
+        json.dump(companies_to_dicts(result), f, indent=2, ensure_ascii=False)
 
-with open('placement_data.json', 'w', encoding='utf-8') as f:
-    json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"Parse cache: {cache.message_hits} messages reused, {cache.message_misses} parsed; "
+          f"{cache.company_hits} companies reused, {cache.company_misses} re-aggregated.")
+    print("Data extraction complete.")
 
-print("Data extraction complete.")
+if __name__ == "__main__":
+    main()
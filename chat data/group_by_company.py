@@ -1,15 +1,18 @@
 import json
-import re
-from datetime import datetime
+from chat_reader import ChatExport
+from company_matcher import CompanyMatcher
+from dedup import DuplicateIndex
+from parse_cache import message_id
+from redact import MESSAGE_RULES, Redactor
 
 companies = [
-    "LTI Mindtree", "LTIMindtree",
+    "LTI Mindtree",
     "ITC Infotech",
     "Infosys",
     "Capgemini",
     "Google",
-    "TCS", "TATA Consultancy Services",
-    "Poornam",
+    "TCS",
+    "Poornam Info Vision",
     "Xempla",
     "Aantaric",
     "HSBC",
@@ -18,7 +21,7 @@ companies = [
     "Quality Austria",
     "Accenture",
     "IBM",
-    "A1 Fence", "A-1 Fence",
+    "A1 Fence",
     "Manikaran",
     "Meditab",
     "Nuvoco Vistas",
@@ -38,59 +41,104 @@ companies = [
     "PMT Machines"
 ]
 
+# Alternative spellings folded into the canonical name at match time
+aliases = {
+    "LTIMindtree": "LTI Mindtree",
+    "TATA Consultancy Services": "TCS",
+    "Poornam": "Poornam Info Vision",
+    "A-1 Fence": "A1 Fence",
+}
+
+# Mentions followed by these are not about the company itself
+exclusions = {
+    "Google": r'\s*(?:form|forms|chrome|meet|maps|classroom|docs|drive|link|sheet|sheets)',
+}
+
+matcher = CompanyMatcher(companies, aliases, exclusions)
+
+redactor = Redactor(MESSAGE_RULES)
+
 def clean_message(msg):
-    # Remove timestamps like '27/09/25, 3:28 pm - +91 98043 64389: '
-    msg = re.sub(r'^\d{2}/\d{2}/\d{2}, \d{1,2}:\d{2}\s?(?:am|pm)\s-\s(?:[^:]+): ', '', msg)
-    # Redact emails
-    msg = re.sub(r'[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+', '[EMAIL]', msg)
-    # Redact phone numbers (with or without +91)
-    msg = re.sub(r'(?:\+?91[\-\s]?)?[6789]\d{4}[\-\s]?\d{5}', '[PHONE]', msg)
-    msg = re.sub(r'\b[6789]\d{9}\b', '[PHONE]', msg)
-    return msg.strip()
-
-grouped_data = {c: [] for c in companies}
-unassigned = []
-
-with open('filtered.txt', 'r', encoding='utf-8') as f:
-    messages = f.read().split('\n---')
-
-for msg in messages:
-    cleaned = clean_message(msg)
-    if not cleaned: continue
-    
-    assigned = False
-    for comp in companies:
-        if comp.lower() == "google":
-            if re.search(r'\bgoogle\b(?!\s*(?:form|forms|chrome|meet|maps|classroom|docs|drive|link|sheet|sheets))', cleaned, re.IGNORECASE):
-                grouped_data[comp].append(cleaned)
-                assigned = True
+    # Drop the timestamp/sender prefix and redact emails and phone numbers
+    return redactor.redact(msg).strip()
+
+class ExportGrouper:
+    """Messages of one export grouped by company, added one message at a time.
+
+    Reposted and forwarded notices are parsed once. Only copies naming the
+    same companies are collapsed: placement cell templates differ in little
+    but the company, and each company keeps its own notice. A group is
+    represented by its first message, so adding messages in chat order
+    gives the same lists as grouping the whole export at once.
+    """
+
+    def __init__(self):
+        self.grouped = {c: [] for c in companies}
+        self.unassigned = []
+        self.messages = []
+        self.timestamps = []
+        self.duplicates = DuplicateIndex()
+
+    def add(self, msg, timestamp=None):
+        """Add the next message of the export; returns the companies whose messages changed."""
+        cleaned = clean_message(msg)
+        if not cleaned:
+            return set()
+        matched = matcher.match(cleaned)
+        self.messages.append(cleaned)
+        self.timestamps.append(timestamp)
+        joined = self.duplicates.add(cleaned, key=frozenset(matched))
+        if len(joined) == 1:
+            # Another copy of a notice already listed
+            return set()
+        lists = [self.grouped[comp] for comp in matched] or [self.unassigned]
+        if joined:
+            # It bridges two or more groups, which now go under the first one
+            for root in joined[1:]:
+                for messages in lists:
+                    messages.remove(self.messages[root])
         else:
-            if comp.lower() in cleaned.lower():
-                grouped_data[comp].append(cleaned)
-                assigned = True
-            
-    if not assigned:
-        unassigned.append(cleaned)
-
-# Normalize company names
-normalized = {
-    "LTI Mindtree": grouped_data["LTI Mindtree"] + grouped_data.get("LTIMindtree", []),
-    "TCS": grouped_data["TCS"] + grouped_data.get("TATA Consultancy Services", []),
-    "Poornam Info Vision": grouped_data["Poornam"],
-    "A1 Fence": grouped_data["A1 Fence"] + grouped_data.get("A-1 Fence", [])
-}
-for c in ["LTIMindtree", "TATA Consultancy Services", "A-1 Fence", "LTI Mindtree", "TCS", "Poornam", "A1 Fence"]:
-    if c in grouped_data:
-        del grouped_data[c]
-        
-grouped_data.update(normalized)
+            for messages in lists:
+                messages.append(cleaned)
+        return set(matched)
+
+    def occurrences(self):
+        # When each collapsed notice was posted, by the id of its first copy
+        return {message_id(self.messages[group[0]]): [self.timestamps[i] for i in group]
+                for group in self.duplicates.groups() if len(group) > 1}
+
+    def result(self):
+        """(grouped messages, occurrences of collapsed reposts, unassigned messages), as group_export returns them."""
+        # Empty companies are left out; lists are copies, so adding more
+        # messages leaves a result alone
+        grouped_data = {k: list(v) for k, v in self.grouped.items() if v}
+        return grouped_data, self.occurrences(), list(self.unassigned)
+
+def group_export(path):
+    """Group the messages of one filtered export by company.
+
+    Returns (grouped messages, occurrences of collapsed reposts, unassigned
+    messages).
+    """
+    grouper = ExportGrouper()
+    with ChatExport(path) as export:
+        for start, end, timestamp in export.offsets:
+            grouper.add(export.read(start, end), timestamp)
+    return grouper.result()
+
+def main():
+    grouped_data, occurrences, unassigned = group_export('filtered.txt')
+
+    with open('grouped_messages.json', 'w', encoding='utf-8') as f:
+        json.dump(grouped_data, f, indent=4, ensure_ascii=False)
 
-# Remove empty companies
-grouped_data = {k: set(v) for k, v in grouped_data.items() if v}
-grouped_data = {k: list(v) for k, v in grouped_data.items()}
+    # When and how often each collapsed notice was posted
+    with open('message_occurrences.json', 'w', encoding='utf-8') as f:
+        json.dump(occurrences, f, indent=4)
 
-with open('grouped_messages.json', 'w', encoding='utf-8') as f:
-    json.dump(grouped_data, f, indent=4, ensure_ascii=False)
+    print(f"Collapsed {sum(len(t) - 1 for t in occurrences.values())} duplicate messages into {len(occurrences)}.")
+    print(f"Grouped into {len(grouped_data)} companies.")
+    print("Companies found:", list(grouped_data.keys()))
 
-print(f"Grouped into {len(grouped_data)} companies.")
-print("Companies found:", list(grouped_data.keys()))
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from dedup import find_duplicate_groups
+from extract_data import extract_companies, parse_company, parser_cache
+from group_by_company import group_export
+from records import Company, companies_to_dicts
+
+# Fields that are lists of values, merged as an ordered union
+LIST_FIELDS = [
+    ("role",),
+    ("engagement_type",),
+    ("eligibility", "allowed_branches"),
+]
+
+# Exports are different groups or batches, so their counts add up, but only
+# over notices no earlier export already had
+SUM_FIELDS = [
+    ("selection_stats", "students_selected"),
+    ("selection_stats", "students_shortlisted"),
+    ("selection_stats", "offered_internship"),
+    ("selection_stats", "converted_to_ppo"),
+]
+
+# Single values that should agree; when they don't, the last export wins and
+# the disagreement is reported
+SCALAR_FIELDS = [
+    ("compensation", "ctc_lpa"),
+    ("compensation", "base_lpa"),
+    ("compensation", "variable_lpa"),
+    ("compensation", "bonus_lpa"),
+    ("compensation", "esop_lpa"),
+    ("compensation", "stipend_monthly"),
+    ("eligibility", "cgpa_cutoff"),
+    ("timeline", "selection_date"),
+    ("timeline", "internship_duration_months"),
+]
+
+
+def get_path(record, path):
+    for name in path:
+        record = getattr(record, name)
+    return record
+
+
+def set_path(record, path, value):
+    setattr(get_path(record, path[:-1]), path[-1], value)
+
+
+def ingest_export(path):
+    """Group and extract one export; runs in a worker process."""
+    grouped, occurrences, unassigned = group_export(path)
+    cache = parser_cache(path + '.parse_cache.json')
+    result = extract_companies(grouped, cache)
+    cache.save()
+    return result, len(unassigned)
+
+
+def new_notices(records):
+    """Per record, the raw messages that are not a notice some earlier record has.
+
+    A notice forwarded into several groups is in every one of their exports,
+    as an exact or near duplicate; it is counted for the first export with it.
+    """
+    if len(records) == 1:
+        return [records[0].raw_messages]
+    messages = [msg for record in records for msg in record.raw_messages]
+    owners = [k for k, record in enumerate(records) for _ in record.raw_messages]
+    new = [[] for _ in records]
+    for group in find_duplicate_groups(messages):
+        owner = owners[group[0]]
+        # Copies within one export were already kept or collapsed by its own grouping
+        new[owner].extend(i for i in group if owners[i] == owner)
+    return [[messages[i] for i in sorted(indices)] for indices in new]
+
+
+def merge_company(name, records, sources, conflicts):
+    """Merge one company's records from several exports into a new record.
+
+    `sources` names the export each record came from, in the order given.
+    """
+    merged = Company(name)
+    notices = new_notices(records)
+    merged.raw_messages = [msg for new in notices for msg in new]
+    for path in LIST_FIELDS:
+        values = [v for record in records for v in get_path(record, path)]
+        set_path(merged, path, list(dict.fromkeys(values)))
+
+    profiles = {}
+    for record in records:
+        for profile in record.offer_profiles:
+            profiles.setdefault((profile.role, profile.ctc_lpa), profile)
+    merged.offer_profiles = list(profiles.values())
+
+    # Each export's counts, from only its new notices; a record with nothing
+    # but new notices is already that
+    counted = [record if len(new) == len(record.raw_messages) else parse_company(name, new)
+               for record, new in zip(records, notices) if new]
+    for path in SUM_FIELDS:
+        values = [get_path(record, path) for record in counted if get_path(record, path) is not None]
+        set_path(merged, path, sum(values) if values else None)
+
+    for path in SCALAR_FIELDS:
+        values = {source: get_path(record, path) for source, record in zip(sources, records)
+                  if get_path(record, path) is not None}
+        if not values:
+            continue
+        chosen = list(values.values())[-1]
+        set_path(merged, path, chosen)
+        if len(set(values.values())) > 1:
+            conflicts.append({
+                "company_name": name,
+                "field": ".".join(path),
+                "values": values,
+                "chosen": chosen,
+            })
+
+    merged.flags.is_result_confirmed = any(r.flags.is_result_confirmed for r in records)
+    merged.flags.is_withdrawn = any(r.flags.is_withdrawn for r in records)
+    merged.flags.data_confidence_score = min(r.flags.data_confidence_score for r in records)
+    merged.notes = "\n".join(dict.fromkeys(r.notes for r in records if r.notes))
+    return merged
+
+
+def merge_results(results, sources):
+    """Merge per-export extraction results, company by company.
+
+    Companies keep the order in which they are first seen across the
+    exports. Conflicting single values are listed in `unresolved_conflicts`.
+    """
+    by_company = {}
+    for source, result in zip(sources, results):
+        for company in result["companies"]:
+            by_company.setdefault(company.company_name, []).append((source, company))
+
+    merged = {"companies": [], "unresolved_conflicts": []}
+    for result in results:
+        merged["unresolved_conflicts"].extend(result["unresolved_conflicts"])
+    for name, entries in by_company.items():
+        names = [source for source, _ in entries]
+        records = [company for _, company in entries]
+        merged["companies"].append(merge_company(name, records, names, merged["unresolved_conflicts"]))
+    return merged
+
+
+def ingest(paths, output='placement_data.json', workers=None):
+    """Ingest several filtered exports, oldest first, into one output file."""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        outcomes = list(pool.map(ingest_export, paths))
+
+    for path, (result, unassigned) in zip(paths, outcomes):
+        print(f"{path}: {len(result['companies'])} companies, {unassigned} unassigned messages")
+
+    sources = [os.path.basename(path) for path in paths]
+    if len(set(sources)) < len(sources):
+        sources = list(paths)
+    merged = merge_results([result for result, _ in outcomes], sources)
+
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(companies_to_dicts(merged), f, indent=2, ensure_ascii=False)
+
+    print(f"Merged {len(paths)} exports into {len(merged['companies'])} companies "
+          f"with {len(merged['unresolved_conflicts'])} unresolved conflicts.")
+    return merged
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: ingest.py EXPORT [EXPORT ...]")
+    ingest(sys.argv[1:])
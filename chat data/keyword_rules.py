@@ -0,0 +1,90 @@
+import time
+from collections import namedtuple
+
+from profiler import SAMPLE_EVERY, profiler
+
+# A rule fires when any of its phrases occurs anywhere in the lowercased text,
+# or any of its words is a whole whitespace-separated token.
+Rule = namedtuple('Rule', ['category', 'label', 'phrases', 'words'])
+
+CHAT_RULES = [
+    Rule('flag', 'is_withdrawn', ('withdrawn', 'cancelled'), ()),
+    Rule('flag', 'is_result_confirmed', ('final selects', 'selected candidates', 'final results', 'selected students'), ()),
+
+    Rule('engagement', 'Full Time', ('full time', 'fte', 'full-time', 'graduate engineer trainee', 'get'), ()),
+    Rule('engagement', 'Internship', ('intern', 'internship'), ()),
+    Rule('engagement', 'PPO', ('ppo',), ()),
+
+    Rule('role', 'Software Engineer', ('software engineer',), ('se',)),
+    Rule('role', 'Digital Specialist Engineer', ('digital specialist engineer',), ()),
+    Rule('role', 'Specialist Programmer', ('specialist programmer',), ()),
+    Rule('role', 'Junior Support Engineer', ('junior support engineer',), ()),
+    Rule('role', 'Graduate Engineer Trainee', ('graduate engineer trainee',), ('get',)),
+    Rule('role', 'System Engineer', ('system engineer', 'associate system engineer'), ()),
+
+    Rule('branch', 'CSE', ('cse',), ()),
+    Rule('branch', 'IT', (), ('it',)),
+    Rule('branch', 'ECE', ('ece',), ()),
+    Rule('branch', 'EEE', ('eee',), ()),
+    Rule('branch', 'ME', ('mechanical',), ()),
+    Rule('branch', 'CE', ('civil',), ()),
+]
+
+# JDs spell branches out, but short words like "me" are too common in chat
+JD_BRANCH_RULES = [
+    Rule('branch', 'CSE', ('computer science', 'cse'), ()),
+    Rule('branch', 'IT', ('information technology',), ('it',)),
+    Rule('branch', 'ECE', ('electronics and communication', 'ece'), ()),
+    Rule('branch', 'EEE', ('electrical', 'eee'), ('ee',)),
+    Rule('branch', 'ME', ('mechanical',), ('me',)),
+]
+
+
+class KeywordClassifier:
+    """Evaluates a rule table against a message in one pass.
+
+    The message is lowercased and split into a token set once; every rule is
+    then checked against that shared structure. Phrases used by several rules
+    are only searched for once per message.
+    """
+
+    def __init__(self, rules, name='rules'):
+        self.name = name
+        self.rules = list(rules)
+        self.categories = list(dict.fromkeys(r.category for r in self.rules))
+        self.phrases = list(dict.fromkeys(p for r in self.rules for p in r.phrases))
+        self.needs_tokens = any(r.words for r in self.rules)
+
+    def classify(self, text):
+        """Return {category: set of labels} for every rule that fires on `text`."""
+        lowered = text.lower()
+        tokens = set(lowered.split()) if self.needs_tokens else ()
+        present = {p for p in self.phrases if p in lowered}
+
+        hits = {c: set() for c in self.categories}
+        for rule in self.rules:
+            if rule.label in hits[rule.category]:
+                continue
+            if any(p in present for p in rule.phrases) or any(w in tokens for w in rule.words):
+                hits[rule.category].add(rule.label)
+        if profiler.enabled:
+            self._profile(lowered, tokens, hits)
+        return hits
+
+    def _profile(self, lowered, tokens, hits):
+        # Every rule is counted; on sampled calls its own check is timed on its own
+        rule_stats = profiler.stats['rule']
+        for rule in self.rules:
+            stats = rule_stats[f'{self.name} {rule.category}: {rule.label}']
+            stats.calls += 1
+            if stats.calls % SAMPLE_EVERY == 1:
+                started = time.perf_counter()
+                any(p in lowered for p in rule.phrases) or any(w in tokens for w in rule.words)
+                stats.wall += time.perf_counter() - started
+                stats.timed += 1
+            if rule.label in hits[rule.category]:
+                stats.hits += 1
+
+
+chat_classifier = KeywordClassifier(CHAT_RULES, 'chat')
+jd_branch_classifier = KeywordClassifier(JD_BRANCH_RULES, 'jd')
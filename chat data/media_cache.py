@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+
+from parse_cache import sources_hash
+
+
+def file_hash(path, chunk_size=1 << 20):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class MediaCache:
+    """Persistent per-file cache of media extraction results.
+
+    Entries are keyed by path and validated by size and mtime; if those
+    changed but the content hash did not (e.g. the file was copied again),
+    the entry is still reused. `sources` are the extractor's own files; if any
+    of them changes, the whole cache is discarded.
+    """
+
+    def __init__(self, path, sources=()):
+        self.path = path
+        self.version = sources_hash(sources)
+        self.entries = {}
+        self._used = {}
+        self.hits = self.misses = 0
+
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    stored = json.load(f)
+            except (OSError, ValueError):
+                stored = {}
+            if stored.get("version") == self.version:
+                self.entries = stored.get("files", {})
+
+    def _stamp(self, filepath):
+        st = os.stat(filepath)
+        return st.st_size, st.st_mtime_ns
+
+    def get(self, filepath):
+        entry = self.entries.get(filepath)
+        if entry is not None:
+            size, mtime_ns = self._stamp(filepath)
+            if entry["size"] != size or entry["mtime_ns"] != mtime_ns:
+                if entry["size"] != size or entry["sha1"] != file_hash(filepath):
+                    entry = None
+                else:
+                    entry = dict(entry, mtime_ns=mtime_ns)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._used[filepath] = entry
+        return entry["result"]
+
+    def put(self, filepath, result):
+        size, mtime_ns = self._stamp(filepath)
+        # Also kept in entries, so a long-running process finds it again
+        self.entries[filepath] = self._used[filepath] = {
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "sha1": file_hash(filepath),
+            "result": result,
+        }
+
+    def save(self):
+        # Only keep files seen this run so deleted attachments drop out
+        stored = {"version": self.version, "files": self._used}
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(stored, f, ensure_ascii=False, separators=(',', ':'))
@@ -0,0 +1,75 @@
+import re
+from collections import defaultdict
+
+# Words split on separators, case changes ("HackWithInfy", "LTIMindtree") and digits
+TOKEN_RE = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+')
+
+# Keys shorter than this only match whole tokens, so "tcs" or "ibm" can't hit
+# the start of an unrelated word
+MIN_PREFIX_KEY = 5
+
+
+def tokenize(text):
+    return tuple(t.lower() for t in TOKEN_RE.findall(text))
+
+
+class MediaResolver:
+    """Resolves media filenames to companies through a token n-gram index.
+
+    Every canonical name (and alias) is indexed by its token sequence and by
+    its tokens joined together ("beatroute"). A filename is tokenized and each
+    of its n-grams looked up, so resolving costs the same however many
+    companies there are. Longer matches score higher; a tie between two
+    companies at the top score is reported as ambiguous.
+    """
+
+    def __init__(self, names, aliases=None):
+        self.index = defaultdict(set)
+        self.max_ngram = 1
+        for name in names:
+            self._add(name, name)
+        known = set(names)
+        for alias, name in (aliases or {}).items():
+            if name in known:
+                self._add(alias, name)
+
+    def _add(self, key, name):
+        tokens = tokenize(key)
+        if not tokens:
+            return
+        self.index[tokens].add(name)
+        self.index[(''.join(tokens),)].add(name)
+        self.max_ngram = max(self.max_ngram, len(tokens))
+
+    def scores(self, filename):
+        tokens = tokenize(filename)
+        scores = {}
+
+        def hit(names, score):
+            for name in names:
+                if score > scores.get(name, 0):
+                    scores[name] = score
+
+        for n in range(1, min(self.max_ngram, len(tokens)) + 1):
+            for i in range(len(tokens) - n + 1):
+                gram = tokens[i:i + n]
+                hit(self.index.get(gram, ()), n + 1)
+                if n > 1:
+                    hit(self.index.get((''.join(gram),), ()), n + 1)
+
+        # "infosysresults": a long key at the start of a token scores lowest
+        for token in tokens:
+            for end in range(MIN_PREFIX_KEY, len(token)):
+                hit(self.index.get((token[:end],), ()), 1)
+        return scores
+
+    def resolve(self, filename):
+        """Return (company name or None, status) with status matched/ambiguous/unmatched."""
+        scores = self.scores(filename)
+        if not scores:
+            return None, 'unmatched'
+        best = max(scores.values())
+        top = [name for name, score in scores.items() if score == best]
+        if len(top) > 1:
+            return None, 'ambiguous'
+        return top[0], 'matched'
@@ -0,0 +1,96 @@
+import re
+from collections import namedtuple
+
+# kind is one of: ctc, ctc_annum, base, bonus, role, stipend, monthly, cgpa,
+# selected, shortlisted. `label` holds the role name for role matches.
+NumericMatch = namedtuple('NumericMatch', ['kind', 'value', 'start', 'end', 'label'])
+
+# Every number in the message, with the unit that follows it (if any)
+SCAN_RE = re.compile(
+    r'(?P<stipend_kw>stipend)'
+    r'|(?P<num>\d+(?:\.\d+)?)'
+    r'(?:(?P<lpa>\s*lpa)'
+    r'|(?P<annum>\s*lakhs\s*per\s*annum)'
+    r'|(?P<cgpa>\s*cgpa)'
+    r'|(?P<shortlisted>\s+shortlisted)'
+    r'|(?P<monthly>/-|\s*per month|\s*pm))?',
+    re.IGNORECASE)
+
+# Context that must directly precede a number, checked only within PREFIX_WINDOW
+PREFIX_WINDOW = 64
+SELECTION_RE = re.compile(r'selection\s+\Z', re.IGNORECASE)
+BASE_RE = re.compile(r'base\s*(?:package)?\s*[:-]?\s*(?:inr|rs\.?)?\s*\Z', re.IGNORECASE)
+BONUS_RE = re.compile(r'bonus\s*[:-]?\s*(?:inr|rs\.?)?\s*\Z', re.IGNORECASE)
+ANNUM_RE = re.compile(r'inr\s*\Z', re.IGNORECASE)
+
+# "Specialist Programmer L3 (Trainee): ₹21 LPA" is a role name, a separator and
+# the amount. The role is found right to left (separator first, then the run of
+# role characters before it) so long lines can't make the regex backtrack.
+ROLE_SEP_RE = re.compile(r'\s*[:-]?\s*(?:inr|rs\.?|₹)?\s*\Z', re.IGNORECASE)
+NON_ROLE_RE = re.compile(r'.*[^a-zA-Z\s0-9()/-]', re.DOTALL)
+
+# What may sit between the word "stipend" and its amount
+STIPEND_GAP_RE = re.compile(r'[\s\w]*[:-]?\s*(?:inr|rs\.?)?\s*', re.IGNORECASE)
+
+# Module-level patterns, for profiler.instrument
+PATTERNS = ['SCAN_RE', 'SELECTION_RE', 'BASE_RE', 'BONUS_RE', 'ANNUM_RE', 'ROLE_SEP_RE', 'NON_ROLE_RE', 'STIPEND_GAP_RE']
+
+
+def scan_numbers(text):
+    """Scan `text` once and return every tagged numeric match in order of position."""
+    matches = []
+    stipend_end = None
+    role_end = 0
+    for m in SCAN_RE.finditer(text):
+        if m.group('stipend_kw'):
+            stipend_end = m.end()
+            continue
+
+        num = m.group('num')
+        start = m.start()
+        end = m.end()
+        window = max(0, start - PREFIX_WINDOW)
+
+        if SELECTION_RE.search(text, window, start):
+            matches.append(NumericMatch('selected', int(num.partition('.')[0]), start, end, None))
+
+        if m.group('lpa'):
+            value = float(num)
+            matches.append(NumericMatch('ctc', value, start, end, None))
+            if BASE_RE.search(text, window, start):
+                matches.append(NumericMatch('base', value, start, end, None))
+            if BONUS_RE.search(text, window, start):
+                matches.append(NumericMatch('bonus', value, start, end, None))
+            # Role names never span lines or reach back into the previous
+            # amount, whether or not that amount had a role of its own
+            role_start = max(text.rfind('\n', 0, start) + 1, role_end)
+            if '\n' not in m.group('lpa'):
+                role_end = end
+                while role_start < start:
+                    role_stop = ROLE_SEP_RE.search(text, role_start + 1, start).start()
+                    run = NON_ROLE_RE.match(text, role_start, role_stop)
+                    if not run:
+                        matches.append(NumericMatch('role', value, role_start, end, text[role_start:role_stop]))
+                        break
+                    role_start = run.end()
+        elif m.group('annum'):
+            if ANNUM_RE.search(text, window, start):
+                matches.append(NumericMatch('ctc_annum', float(num), start, end, None))
+        elif m.group('cgpa'):
+            matches.append(NumericMatch('cgpa', float(num), start, end, None))
+        elif m.group('shortlisted'):
+            matches.append(NumericMatch('shortlisted', int(num.rpartition('.')[2]), start, end, None))
+        elif m.group('monthly'):
+            # Amounts are the 2-6 digits right before the unit
+            digits = num.rpartition('.')[2][-6:]
+            if len(digits) >= 2:
+                digits_start = m.start('num') + len(num) - len(digits)
+                keyed = stipend_end is not None and STIPEND_GAP_RE.fullmatch(text, stipend_end, digits_start)
+                kind = 'stipend' if keyed else 'monthly'
+                matches.append(NumericMatch(kind, float(digits), digits_start, end, None))
+    return matches
+
+
+def last_by_kind(matches):
+    """Map each kind to its last match, the way the parser resolves repeated mentions."""
+    return {m.kind: m for m in matches}
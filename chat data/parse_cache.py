@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+
+
+def content_hash(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def message_id(text):
+    # Short id of a message's text, shared by the message store, the SQLite
+    # export and the repost occurrences
+    return content_hash(text)[:16]
+
+
+def sources_hash(paths):
+    h = hashlib.sha1()
+    for path in paths:
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+class ParseCache:
+    """Persistent cache of per-message and per-company extraction results.
+
+    Messages are keyed by a hash of their text and companies by a hash of
+    their name plus the ordered hashes of their messages, so a rerun only
+    parses new or edited messages and only re-aggregates companies whose
+    message set changed. `sources` are the parser's own files; if any of
+    them changes, the whole cache is discarded.
+    """
+
+    def __init__(self, path, sources=()):
+        self.path = path
+        self.version = sources_hash(sources)
+        self.messages = {}
+        self.companies = {}
+        self._used_messages = {}
+        self._used_companies = {}
+        self._company_messages = {}
+        self.message_hits = self.message_misses = 0
+        self.company_hits = self.company_misses = 0
+
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    stored = json.load(f)
+            except (OSError, ValueError):
+                stored = {}
+            if stored.get("version") == self.version:
+                self.messages = stored.get("messages", {})
+                self.companies = stored.get("companies", {})
+
+    def message(self, msg, parse):
+        key = content_hash(msg)
+        facts = self.messages.get(key)
+        if facts is None:
+            # Also kept in messages, so a long-running process finds it again
+            facts = self.messages[key] = parse(msg)
+            self.message_misses += 1
+        else:
+            self.message_hits += 1
+        self._used_messages[key] = facts
+        return facts
+
+    def company_key(self, name, messages):
+        hashes = [content_hash(msg) for msg in messages]
+        h = hashlib.sha1(name.encode('utf-8'))
+        for msg_hash in hashes:
+            h.update(msg_hash.encode('ascii'))
+        key = h.hexdigest()
+        self._company_messages[key] = hashes
+        return key
+
+    def get_company(self, key):
+        parsed = self.companies.get(key)
+        if parsed is None:
+            self.company_misses += 1
+            return None
+        self.company_hits += 1
+        self._used_companies[key] = parsed
+        # Keep the company's messages too, for when it changes next time
+        for msg_hash in self._company_messages.get(key, ()):
+            if msg_hash in self.messages:
+                self._used_messages[msg_hash] = self.messages[msg_hash]
+        return parsed
+
+    def put_company(self, key, parsed):
+        self.companies[key] = self._used_companies[key] = parsed
+
+    def save(self):
+        # Only keep what this run used so the cache doesn't grow forever
+        stored = {
+            "version": self.version,
+            "messages": self._used_messages,
+            "companies": self._used_companies,
+        }
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(stored, f, ensure_ascii=False, separators=(',', ':'))
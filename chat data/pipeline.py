@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import pickle
+import sys
+from collections import namedtuple
+
+import chat_reader
+import company_matcher
+import dedup
+import extract_data
+import group_by_company
+import keyword_rules
+import media_resolver
+import numeric_extractor
+import parse_cache
+import process_media
+import publish
+import records
+import redact
+import search_index
+import sqlite_export
+import summary
+import text_store
+import xlsx_rows
+from parse_cache import sources_hash
+from profiler import profiler
+
+CHAT_FILE = 'filtered.txt'
+PARSE_CACHE_FILE = 'parse_cache.json'
+STAGE_CACHE_DIR = 'stage_cache'
+PROFILE_FILE = 'profile.json'
+PROFILE_STACKS_FILE = 'profile.folded'
+
+# `sources` are the stage's own code, `inputs` stamps the files it reads
+# that no other stage produces, and `run` gets the outputs of `deps` in order
+Stage = namedtuple('Stage', 'name deps sources inputs run')
+
+
+def file_stamp(path):
+    # Size and mtime, like the chat index; hashing a multi-GB export would cost more than grouping it
+    try:
+        st = os.stat(path)
+    except OSError:
+        return [path, None]
+    return [path, st.st_size, st.st_mtime_ns]
+
+
+def dir_stamp(path):
+    if not os.path.isdir(path):
+        return [path, None]
+    return [file_stamp(os.path.join(path, name)) for name in sorted(os.listdir(path))]
+
+
+def run_group():
+    grouped, occurrences, unassigned = group_by_company.group_export(CHAT_FILE)
+    print(f"Grouped into {len(grouped)} companies, {len(unassigned)} messages unassigned.")
+    return {"grouped": grouped, "occurrences": occurrences}
+
+
+def run_extract(grouped):
+    cache = extract_data.parser_cache(PARSE_CACHE_FILE)
+    result = extract_data.extract_companies(grouped["grouped"], cache)
+    cache.save()
+    print(f"Parse cache: {cache.message_hits} messages reused, {cache.message_misses} parsed.")
+    return result
+
+
+def run_media(data):
+    data["companies"] = process_media.process_media_files(data["companies"])
+    return data
+
+
+def run_publish(data):
+    publish.publish_data(data, process_media.PLACEMENT_FILE)
+
+
+STAGES = [
+    Stage("group", [],
+          [group_by_company.__file__, company_matcher.__file__, chat_reader.__file__, dedup.__file__, redact.__file__,
+           parse_cache.__file__],
+          lambda: file_stamp(CHAT_FILE), run_group),
+    Stage("extract", ["group"],
+          [extract_data.__file__, keyword_rules.__file__, numeric_extractor.__file__, records.__file__],
+          lambda: None, run_extract),
+    Stage("media", ["extract"],
+          [process_media.__file__, media_resolver.__file__, xlsx_rows.__file__, text_store.__file__, keyword_rules.__file__],
+          lambda: dir_stamp(process_media.MEDIA_DIR), run_media),
+    # Publishing has no output of its own and reruns only when its code or
+    # the data changes; `pipeline.py publish --force` rewrites deleted files
+    Stage("publish", ["media"],
+          [publish.__file__, summary.__file__, sqlite_export.__file__, search_index.__file__, parse_cache.__file__],
+          lambda: None, run_publish),
+]
+
+
+class HashingWriter:
+    """File wrapper that feeds everything written through it to a hash."""
+
+    def __init__(self, f, digest):
+        self.f = f
+        self.digest = digest
+
+    def write(self, data):
+        self.digest.update(data)
+        return self.f.write(data)
+
+
+class Pipeline:
+    """Runs the stages in dependency order, handing outputs over in memory.
+
+    Each stage's output is stored with a fingerprint of its code, its
+    external inputs and the digests of what its upstream stages produced, so
+    a stage that reran with the same result doesn't rerun the ones after it.
+    A stage whose fingerprint matches the stored one is skipped, and its
+    output is only loaded if a stage after it has to run. Stages left out of
+    `targets` never run; what they produced last time is used instead.
+    """
+
+    def __init__(self, stages=STAGES, cache_dir=STAGE_CACHE_DIR):
+        self.stages = {stage.name: stage for stage in stages}
+        self.order = [stage.name for stage in stages]
+        for stage in stages:
+            for dep in stage.deps:
+                if self.order.index(dep) > self.order.index(stage.name):
+                    raise ValueError(f"Stage {stage.name} is listed before its dependency {dep}")
+        self.cache_dir = cache_dir
+        self.outputs = {}
+        self.digests = {}
+
+    def _path(self, name, suffix):
+        return os.path.join(self.cache_dir, name + suffix)
+
+    def _save(self, name, fingerprint, output):
+        """Store a stage's output and fingerprint; returns the output's digest."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        digest = hashlib.sha1()
+
+        def write_output(f):
+            # Hashed as it is written, so the output is never held twice
+            pickle.dump(output, HashingWriter(f, digest), pickle.HIGHEST_PROTOCOL)
+
+        # The fingerprint is written last, so it never vouches for a half-written output
+        for suffix, write in (('.pickle', write_output),
+                              ('.digest', lambda f: f.write(digest.hexdigest().encode('ascii'))),
+                              ('.fingerprint', lambda f: f.write(fingerprint.encode('ascii')))):
+            path = self._path(name, suffix)
+            tmp = f'{path}.{os.getpid()}.tmp'
+            with open(tmp, 'wb') as f:
+                write(f)
+            os.replace(tmp, path)
+        return digest.hexdigest()
+
+    def _stored(self, name, suffix):
+        # Kept apart from the output, which is only loaded if a later stage needs it
+        try:
+            with open(self._path(name, suffix), 'r', encoding='ascii') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def stored_fingerprint(self, name):
+        return self._stored(name, '.fingerprint')
+
+    def stored_digest(self, name):
+        return self._stored(name, '.digest')
+
+    def output(self, name):
+        if name not in self.outputs:
+            try:
+                with open(self._path(name, '.pickle'), 'rb') as f:
+                    self.outputs[name] = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                raise RuntimeError(f"No stored output for stage '{name}'; run it first")
+        return self.outputs[name]
+
+    def fingerprint(self, stage):
+        h = hashlib.sha1(stage.name.encode('utf-8'))
+        h.update(sources_hash(stage.sources).encode('ascii'))
+        h.update(json.dumps(stage.inputs()).encode('utf-8'))
+        for dep in stage.deps:
+            h.update((self.digests.get(dep) or '').encode('ascii'))
+        return h.hexdigest()
+
+    def run(self, targets=None, force=False):
+        """Run `targets` (all stages by default); returns {stage: 'ran' | 'skipped' | 'stored'}."""
+        targets = set(targets or self.order)
+        unknown = targets - set(self.stages)
+        if unknown:
+            raise ValueError(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+        status = {}
+        for name in self.order:
+            stage = self.stages[name]
+            if name not in targets:
+                self.digests[name] = self.stored_digest(name)
+                status[name] = 'stored'
+                continue
+            fingerprint = self.fingerprint(stage)
+            if not force and fingerprint == self.stored_fingerprint(name):
+                self.digests[name] = self.stored_digest(name)
+                status[name] = 'skipped'
+                continue
+            print(f"Running {name}...")
+            inputs = [self.output(dep) for dep in stage.deps]
+            with profiler.section('stage', name):
+                output = stage.run(*inputs)
+            self.digests[name] = self._save(name, fingerprint, output)
+            self.outputs[name] = output
+            status[name] = 'ran'
+        return status
+
+
+def enable_profiling():
+    profiler.enabled = True
+    profiler.instrument(numeric_extractor, numeric_extractor.PATTERNS)
+    # Also done in media worker processes, which send their counts back
+    profiler.instrument(process_media, process_media.PATTERNS)
+    profiler.instrument(dedup, ['HEADER_RE', 'WORD_RE', 'NUMBER_RE'])
+    profiler.instrument(group_by_company.redactor, ['pattern'], 'redact')
+    profiler.instrument(group_by_company.matcher, ['pattern'], 'company_matcher')
+
+
+def main(args):
+    force = '--force' in args
+    # --profile writes a JSON report; --flamegraph also writes folded stacks
+    profile = '--profile' in args or '--flamegraph' in args
+    targets = [a for a in args if a not in ('--force', '--profile', '--flamegraph')]
+    if profile:
+        enable_profiling()
+    try:
+        status = Pipeline().run(targets, force)
+    except (ValueError, RuntimeError) as e:
+        sys.exit(str(e))
+    print(", ".join(f"{name}: {state}" for name, state in status.items()))
+    if profile:
+        profiler.write(PROFILE_FILE, PROFILE_STACKS_FILE if '--flamegraph' in args else None)
+        print(f"Wrote profile to {PROFILE_FILE}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,138 +1,280 @@
 import os
 import json
 import re
-import fitz  # PyMuPDF
-import pandas as pd
-from docx import Document
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from functools import partial
+import keyword_rules
+import text_store
+import xlsx_rows
+from keyword_rules import jd_branch_classifier
+from media_cache import MediaCache, file_hash
+from media_resolver import MediaResolver
+from profiler import profiler
+from publish import publish_data
+from records import Company
+from text_store import TextStore
+from xlsx_rows import count_data_rows
 
 MEDIA_DIR = 'media'
 PLACEMENT_FILE = '../backend/data/placement_data.json'
+MEDIA_CACHE_FILE = 'media_cache.json'
+MEDIA_TEXT_DIR = 'media_text'
 
-def extract_text_from_pdf(pdf_path):
+# Filename spellings that don't contain the company's own name
+MEDIA_ALIASES = {
+    "infy": "Infosys",
+    "hackwithinfy": "Infosys",
+}
+
+# Stop reading a JD after this many pages (None reads everything)
+MAX_DOCUMENT_PAGES = None
+# Once CGPA and CTC are both found, stop after this many pages add nothing new
+EARLY_EXIT_PAGES = 2
+# DOCX files have no pages; paragraphs are fed to the scanners in chunks this size
+DOCX_CHUNK_PARAGRAPHS = 50
+
+CGPA_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(?:cgpa|%)', re.IGNORECASE)
+CTC_RE = re.compile(r'(\d+(?:\.\d+)?)\s*lpa', re.IGNORECASE)
+# Regex names, for the profiler
+PATTERNS = ['CGPA_RE', 'CTC_RE']
+
+# Heavy libraries are only imported once a file of their type shows up.
+# Import errors are left to propagate so a missing library isn't cached as an empty result.
+
+def iter_pdf_pages(pdf_path, start=0):
+    import fitz  # PyMuPDF
     try:
-        doc = fitz.open(pdf_path)
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        return text
+        with fitz.open(pdf_path) as doc:
+            for i in range(start, doc.page_count):
+                yield doc.load_page(i).get_text()
     except Exception as e:
         print(f"Error reading PDF {pdf_path}: {e}")
-        return ""
 
-def extract_text_from_docx(docx_path):
+def iter_docx_chunks(docx_path, start=0):
+    from docx import Document
     try:
         doc = Document(docx_path)
-        return "\n".join([para.text for para in doc.paragraphs])
+        paragraphs = [para.text for para in doc.paragraphs]
+        for i in range(start * DOCX_CHUNK_PARAGRAPHS, len(paragraphs), DOCX_CHUNK_PARAGRAPHS):
+            yield "\n".join(paragraphs[i:i + DOCX_CHUNK_PARAGRAPHS])
     except Exception as e:
         print(f"Error reading DOCX {docx_path}: {e}")
-        return ""
+
+def iter_document_pages(filepath, text_store, max_pages=MAX_DOCUMENT_PAGES):
+    # Pages come from the text store when we've seen this file before; the document is
+    # only opened for pages we haven't extracted yet. Whatever was read is stored
+    # again when the caller stops, including when it stops early.
+    reader = iter_pdf_pages if filepath.endswith(".pdf") else iter_docx_chunks
+    key = file_hash(filepath)
+    stored = text_store.load(key)
+    pages, complete = stored if stored else ([], False)
+    dirty = False
+    try:
+        for page in pages[:max_pages]:
+            yield page
+        if complete or (max_pages is not None and len(pages) >= max_pages):
+            return
+        # Closed as soon as we stop, so the document isn't left open until
+        # the reader is garbage collected
+        with closing(reader(filepath, start=len(pages))) as new_pages:
+            for page in new_pages:
+                pages.append(page)
+                dirty = True
+                yield page
+                if max_pages is not None and len(pages) >= max_pages:
+                    return
+        complete = True
+        dirty = True
+    finally:
+        if dirty:
+            text_store.save(key, pages, complete)
+
+class JDScanner:
+    # Collects CGPA, CTC and branch mentions as pages arrive
+    def __init__(self):
+        self.cgpas = []
+        self.ctcs = []
+        self.branches = set()
+        
+    def feed(self, text):
+        # Returns whether this text changed anything we'd report.
+        # Be careful picking the right CGPA, usually it's something like 6.0, 6.5, 7.0
+        cgpas = [float(c) for c in CGPA_RE.findall(text) if 5.0 <= float(c) <= 10.0]
+        ctcs = [float(c) for c in CTC_RE.findall(text) if 2.0 <= float(c) <= 50.0]
+        branches = jd_branch_classifier.classify(text)['branch'] - self.branches
+        changed = bool(branches)
+        changed |= bool(cgpas) and (not self.cgpas or max(cgpas) > max(self.cgpas))
+        changed |= bool(ctcs) and (not self.ctcs or max(ctcs) > max(self.ctcs))
+        self.cgpas.extend(cgpas)
+        self.ctcs.extend(ctcs)
+        self.branches |= branches
+        return changed
+        
+    @property
+    def complete(self):
+        return bool(self.cgpas) and bool(self.ctcs)
 
 def extract_excel_row_count(excel_path):
     # Useful for shortlists and final selects
+    # We can assume the number of data rows (below the header) is roughly the number of students
     try:
-        # Read the first sheet
-        df = pd.read_excel(excel_path, engine='openpyxl')
-        # We can assume the number of rows is roughly the number of students
-        # Need to subtract header rows if any, but len(df) is a good proxy.
-        return len(df)
+        if excel_path.endswith(".xlsx"):
+            # Stream the first sheet's rows straight from the archive, no DataFrame
+            return count_data_rows(excel_path)
+    except Exception as e:
+        print(f"Error reading Excel {excel_path}: {e}")
+        return 0
+        
+    # Legacy .xls needs pandas (and xlrd)
+    import pandas as pd
+    try:
+        return len(pd.read_excel(excel_path))
     except Exception as e:
         print(f"Error reading Excel {excel_path}: {e}")
         return 0
 
-def process_media_files(companies):
-    # Mapping of files to companies
-    # Very rudimentary but allows us to match filenames to company names
-    company_names = {c["company_name"].lower(): c for c in companies}
+def extract_media_file(filepath):
+    # Everything we take from one attachment, independent of the company it belongs to.
+    # Runs in worker processes, so it only returns plain JSON.
+    result = {"row_count": None, "cgpas": [], "ctcs": [], "branches": []}
     
-    if not os.path.exists(MEDIA_DIR):
-        print("Media directory not found.")
-        return companies
+    if filepath.endswith(".xlsx") or filepath.endswith(".xls"):
+        result["row_count"] = extract_excel_row_count(filepath)
         
-    files = os.listdir(MEDIA_DIR)
-    
-    for filename in files:
-        filepath = os.path.join(MEDIA_DIR, filename)
-        fname_lower = filename.lower()
+    if filepath.endswith(".pdf") or filepath.endswith(".docx"):
+        scanner = JDScanner()
+        quiet = 0
+        with closing(iter_document_pages(filepath, TextStore(MEDIA_TEXT_DIR))) as pages:
+            for page in pages:
+                quiet = 0 if scanner.feed(page) else quiet + 1
+                if scanner.complete and quiet >= EARLY_EXIT_PAGES:
+                    break
+        result["cgpas"] = scanner.cgpas
+        result["ctcs"] = scanner.ctcs
+        result["branches"] = sorted(scanner.branches)
         
-        # Try to match the filename to a company
-        matched_company = None
-        for c_name, c_data in company_names.items():
-            # A bit naive: if company name is in filename
-            # Some names are short like "IEM" or "TCS"
-            if c_name in fname_lower:
-                matched_company = c_data
-                break
-                
-        # Handle some edge cases or special names
-        if not matched_company:
-            if "hackwithinfy" in fname_lower:
-                matched_company = company_names.get("infosys")
-            elif "infy" in fname_lower:
-                matched_company = company_names.get("infosys")
-            elif "capgemini" in fname_lower:
-                matched_company = company_names.get("capgemini")
-            elif "ibm" in fname_lower:
-                matched_company = company_names.get("ibm")
-
-        if not matched_company:
-            # If no company matches, we skip for now.
-            continue
-            
-        print(f"Processing {filename} for {matched_company['company_name']}")
+    return result
+
+def extract_media_file_timed(filepath, profile=False):
+    # Worker processes can't reach the profiler, so their timings, and with
+    # `profile` their regex and rule counters, travel back with the result
+    if profile:
+        profiler.enabled = True
+        profiler.instrument(sys.modules[__name__], PATTERNS, 'process_media')
+        # Whatever this process inherited or counted before is not this file's
+        profiler.drain()
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = extract_media_file(filepath)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    return result, wall, cpu, profiler.drain() if profile else None
+
+def extract_media_files(filepaths, cache, workers=None):
+    # Cached files are never reopened; the rest are extracted in a process pool.
+    # Results come back in input order so the merge is the same as a serial run.
+    results = {}
+    pending = []
+    for filepath in filepaths:
+        cached = cache.get(filepath)
+        if cached is None:
+            pending.append(filepath)
+        else:
+            results[filepath] = cached
             
-        # 1. Processing Excel Files (Shortlists / Final Selects)
-        if filename.endswith(".xlsx") or filename.endswith(".xls"):
-            count = extract_excel_row_count(filepath)
-            if count > 0:
-                if "shortlist" in fname_lower:
-                    current = matched_company["selection_stats"]["students_shortlisted"] or 0
-                    matched_company["selection_stats"]["students_shortlisted"] = max(current, count)
-                elif "select" in fname_lower or "final" in fname_lower:
-                    current = matched_company["selection_stats"]["students_selected"] or 0
-                    # Only update if the generic chat parsing was likely wrong or smaller
-                    matched_company["selection_stats"]["students_selected"] = max(current, count)
-                    matched_company["flags"]["is_result_confirmed"] = True
-
-        # 2. Processing PDF & Word (JDs)
-        text = ""
-        if filename.endswith(".pdf"):
-            text = extract_text_from_pdf(filepath)
-        elif filename.endswith(".docx"):
-            text = extract_text_from_docx(filepath)
+    if len(pending) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            extracted = list(pool.map(partial(extract_media_file_timed, profile=profiler.enabled), pending))
+    else:
+        extracted = [extract_media_file_timed(filepath) for filepath in pending]
+        
+    for filepath, (result, wall, cpu, counters) in zip(pending, extracted):
+        profiler.add('media', os.path.basename(filepath), wall, cpu)
+        profiler.merge(counters)
+        cache.put(filepath, result)
+        results[filepath] = result
+    return results
+
+def apply_media_result(company, filename, result):
+    fname_lower = filename.lower()
+    stats = company.selection_stats
+    
+    # 1. Excel Files (Shortlists / Final Selects)
+    count = result["row_count"]
+    if count:
+        if "shortlist" in fname_lower:
+            stats.students_shortlisted = max(stats.students_shortlisted or 0, count)
+        elif "select" in fname_lower or "final" in fname_lower:
+            # Only update if the generic chat parsing was likely wrong or smaller
+            stats.students_selected = max(stats.students_selected or 0, count)
+            company.flags.is_result_confirmed = True
             
-        if text:
-            # Extract CGPA Cutoffs from JD
-            cgpa_matches = re.findall(r'(\d+(?:\.\d+)?)\s*(?:cgpa|%)', text, re.IGNORECASE)
-            if cgpa_matches:
-                # Be careful picking the right one, usually it's something like 6.0, 6.5, 7.0
-                valid_cgpas = [float(c) for c in cgpa_matches if 5.0 <= float(c) <= 10.0]
-                if valid_cgpas:
-                    matched_company["eligibility"]["cgpa_cutoff"] = max(valid_cgpas)
-                    
-            # Extract detailed allowed branches from JD
-            branches = matched_company["eligibility"]["allowed_branches"]
-            if "computer science" in text.lower() or "cse" in text.lower():
-                if "CSE" not in branches: branches.append("CSE")
-            if "information technology" in text.lower() or "it" in text.lower().split():
-                if "IT" not in branches: branches.append("IT")
-            if "electronics and communication" in text.lower() or "ece" in text.lower():
-                if "ECE" not in branches: branches.append("ECE")
-            if "electrical" in text.lower() or "eee" in text.lower() or "ee" in text.lower().split():
-                if "EEE" not in branches: branches.append("EEE")
-            if "mechanical" in text.lower() or "me" in text.lower().split():
-                if "ME" not in branches: branches.append("ME")
-                
-            matched_company["eligibility"]["allowed_branches"] = list(set(branches))
+    # 2. PDF & Word (JDs)
+    # CGPA cutoff from JD
+    if result["cgpas"]:
+        company.eligibility.cgpa_cutoff = max(result["cgpas"])
+        
+    # Detailed allowed branches from JD
+    if result["branches"]:
+        company.eligibility.allowed_branches = sorted(set(company.eligibility.allowed_branches) | set(result["branches"]))
+        
+    # Better CTC if available
+    if result["ctcs"]:
+        highest_ctc = max(result["ctcs"])
+        current_ctc = company.compensation.ctc_lpa
+        if not current_ctc or highest_ctc > current_ctc:
+            company.compensation.ctc_lpa = highest_ctc
+
+def media_cache():
+    # Results depend on the row counter and the stored JD text too, so editing
+    # either of them invalidates the cache like editing this file does
+    return MediaCache(MEDIA_CACHE_FILE, [__file__, keyword_rules.__file__, xlsx_rows.__file__, text_store.__file__])
+
+def match_media_files(resolver, files):
+    # Mapping of files to companies through a token index over company names
+    matched = []
+    ambiguous = []
+    unmatched = []
+    
+    for filename in files:
+        name, status = resolver.resolve(filename)
+        if status == 'matched':
+            matched.append((filename, name))
+        elif status == 'ambiguous':
+            ambiguous.append(filename)
+        else:
+            # If no company matches, we skip for now.
+            unmatched.append(filename)
+    return matched, ambiguous, unmatched
+
+def process_media_files(companies, workers=None):
+    company_names = {c.company_name: c for c in companies}
+    resolver = MediaResolver(list(company_names), MEDIA_ALIASES)
+    
+    if not os.path.exists(MEDIA_DIR):
+        print("Media directory not found.")
+        return companies
+        
+    # Sorted so the merge order doesn't depend on the filesystem
+    files = sorted(os.listdir(MEDIA_DIR))
+    matched, ambiguous, unmatched = match_media_files(resolver, files)
+    matched = [(filename, company_names[name]) for filename, name in matched]
             
-            # Extract better CTC if available
-            ctc_matches = re.findall(r'(\d+(?:\.\d+)?)\s*lpa', text, re.IGNORECASE)
-            if ctc_matches:
-                valid_ctcs = [float(c) for c in ctc_matches if 2.0 <= float(c) <= 50.0]
-                if valid_ctcs:
-                    highest_ctc = max(valid_ctcs)
-                    current_ctc = matched_company["compensation"]["ctc_lpa"]
-                    if not current_ctc or highest_ctc > current_ctc:
-                        matched_company["compensation"]["ctc_lpa"] = highest_ctc
+    print(f"Resolved {len(matched)} media files; {len(ambiguous)} ambiguous, {len(unmatched)} unmatched.")
+    for filename in ambiguous:
+        print(f"  Ambiguous: {filename}")
+    for filename in unmatched:
+        print(f"  Unmatched: {filename}")
+        
+    cache = media_cache()
+    results = extract_media_files([os.path.join(MEDIA_DIR, f) for f, _ in matched], cache, workers)
+    cache.save()
+    print(f"Media cache: {cache.hits} files reused, {cache.misses} extracted.")
+    
+    for filename, company in matched:
+        print(f"Processing {filename} for {company.company_name}")
+        apply_media_result(company, filename, results[os.path.join(MEDIA_DIR, filename)])
     
     return companies
 
@@ -145,7 +287,7 @@ def main():
     with open(PLACEMENT_FILE, 'r', encoding='utf-8') as f:
         data = json.load(f)
         
-    companies = data.get("companies", [])
+    companies = [Company.from_dict(c) for c in data.get("companies", [])]
     if not companies:
         print("No companies found in placement data.")
         return
@@ -154,15 +296,7 @@ def main():
     
     data["companies"] = updated_companies
     
-    # Save back to backend
-    print(f"Saving updated data to {PLACEMENT_FILE}...")
-    with open(PLACEMENT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4)
-        
-    # Also save to local root
-    local_file = 'media_extracted_data.json'
-    with open(local_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4)
+    publish_data(data, PLACEMENT_FILE)
         
     print("Done!")
 
@@ -0,0 +1,206 @@
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Regexes and rules are counted on every call but only timed on one call in this many
+SAMPLE_EVERY = 16
+
+
+class Stats:
+    __slots__ = ('calls', 'hits', 'wall', 'cpu', 'timed')
+
+    def __init__(self):
+        self.calls = self.hits = self.timed = 0
+        self.wall = self.cpu = 0.0
+
+    def as_dict(self, name):
+        entry = {"name": name, "calls": self.calls}
+        if self.timed < self.calls:
+            # Only some calls were timed; scale their time up to all calls
+            scale = self.calls / self.timed if self.timed else 0
+            entry.update(timed_calls=self.timed, wall_seconds=round(self.wall * scale, 6))
+        else:
+            entry.update(wall_seconds=round(self.wall, 6), cpu_seconds=round(self.cpu, 6))
+        if self.hits:
+            entry["hits"] = self.hits
+        return entry
+
+
+class ProfiledPattern:
+    """Stands in for a compiled regex, counting calls and matches and timing a sample of them."""
+
+    def __init__(self, pattern, stats):
+        self.pattern = pattern
+        self.stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self.pattern, name)
+
+    def _timed(self):
+        self.stats.calls += 1
+        return self.stats.calls % SAMPLE_EVERY == 1
+
+    def _call(self, method, args):
+        if not self._timed():
+            m = method(*args)
+        else:
+            started = time.perf_counter()
+            m = method(*args)
+            self.stats.wall += time.perf_counter() - started
+            self.stats.timed += 1
+        if m is not None:
+            self.stats.hits += 1
+        return m
+
+    def search(self, *args):
+        return self._call(self.pattern.search, args)
+
+    def match(self, *args):
+        return self._call(self.pattern.match, args)
+
+    def fullmatch(self, *args):
+        return self._call(self.pattern.fullmatch, args)
+
+    def finditer(self, *args):
+        if not self._timed():
+            return self._counted(self.pattern.finditer(*args))
+        started = time.perf_counter()
+        found = list(self.pattern.finditer(*args))
+        self.stats.wall += time.perf_counter() - started
+        self.stats.timed += 1
+        self.stats.hits += len(found)
+        return iter(found)
+
+    def _counted(self, matches):
+        for m in matches:
+            self.stats.hits += 1
+            yield m
+
+    def findall(self, *args):
+        if not self._timed():
+            found = self.pattern.findall(*args)
+        else:
+            started = time.perf_counter()
+            found = self.pattern.findall(*args)
+            self.stats.wall += time.perf_counter() - started
+            self.stats.timed += 1
+        self.stats.hits += len(found)
+        return found
+
+    def sub(self, repl, string, count=0):
+        # subn, so replacements are counted as hits like matches elsewhere
+        if not self._timed():
+            result, hits = self.pattern.subn(repl, string, count)
+        else:
+            started = time.perf_counter()
+            result, hits = self.pattern.subn(repl, string, count)
+            self.stats.wall += time.perf_counter() - started
+            self.stats.timed += 1
+        self.stats.hits += hits
+        return result
+
+
+class Profiler:
+    """Wall/CPU timings of nested sections plus per-regex and per-rule counters.
+
+    Sections are stages, companies and media files; their self time is also
+    kept per call stack and can be written as folded stacks for
+    flamegraph.pl or speedscope. Nothing is recorded until `enabled` is set,
+    and regexes are only wrapped by `instrument`, so a run without
+    --profile pays for one attribute check per section.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.stats = defaultdict(lambda: defaultdict(Stats))
+        self.stacks = defaultdict(float)
+        self._stack = []
+        self._children = []
+
+    @contextmanager
+    def section(self, kind, name):
+        if not self.enabled:
+            yield
+            return
+        self._stack.append(f'{kind} {name}')
+        self._children.append(0.0)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            # Work in worker processes can add up to more than the section's own wall time
+            self.stacks[tuple(self._stack)] += max(wall - self._children.pop(), 0.0)
+            self._stack.pop()
+            if self._children:
+                self._children[-1] += wall
+            self._record(kind, name, wall, cpu)
+
+    def add(self, kind, name, wall, cpu):
+        # For work timed elsewhere (e.g. in a worker process), nested in the current section
+        if not self.enabled:
+            return
+        self.stacks[tuple(self._stack) + (f'{kind} {name}',)] += wall
+        if self._children:
+            self._children[-1] += wall
+        self._record(kind, name, wall, cpu)
+
+    def drain(self, kinds=('regex', 'rule')):
+        # Counters of `kinds` as plain data, reset to zero in place (patterns
+        # keep their Stats objects); for sending a worker's counts back
+        counters = {}
+        for kind in kinds:
+            for name, stats in self.stats[kind].items():
+                if stats.calls:
+                    counters.setdefault(kind, {})[name] = [getattr(stats, f) for f in Stats.__slots__]
+                    stats.calls = stats.hits = stats.timed = 0
+                    stats.wall = stats.cpu = 0.0
+        return counters
+
+    def merge(self, counters):
+        for kind, entries in (counters or {}).items():
+            for name, values in entries.items():
+                stats = self.stats[kind][name]
+                for field, value in zip(Stats.__slots__, values):
+                    setattr(stats, field, getattr(stats, field) + value)
+
+    def _record(self, kind, name, wall, cpu):
+        stats = self.stats[kind][name]
+        stats.calls += 1
+        stats.timed += 1
+        stats.wall += wall
+        stats.cpu += cpu
+
+    def instrument(self, owner, names, label=None):
+        # Swaps compiled patterns on a module (or object) for counting proxies;
+        # the code using them looks them up at call time
+        label = label or owner.__name__
+        for name in names:
+            pattern = getattr(owner, name)
+            if not isinstance(pattern, ProfiledPattern):
+                setattr(owner, name, ProfiledPattern(pattern, self.stats['regex'][f'{label}.{name}']))
+
+    def report(self):
+        return {
+            "sample_every": SAMPLE_EVERY,
+            "sections": {
+                kind: sorted((s.as_dict(name) for name, s in entries.items()),
+                             key=lambda e: e.get("wall_seconds", 0), reverse=True)
+                for kind, entries in self.stats.items()
+            },
+        }
+
+    def write(self, report_path, stacks_path=None):
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2, ensure_ascii=False)
+        if stacks_path:
+            # One line per stack, self time in microseconds as the sample count
+            with open(stacks_path, 'w', encoding='utf-8') as f:
+                for stack, seconds in self.stacks.items():
+                    frames = ';'.join(frame.replace(';', ',') for frame in stack)
+                    f.write(f'{frames} {round(seconds * 1e6)}\n')
+
+
+profiler = Profiler()
@@ -0,0 +1,274 @@
+import hashlib
+import json
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+
+from parse_cache import message_id
+from records import Company
+from search_index import build_search_index, company_terms
+from sqlite_export import update_sqlite, write_sqlite
+from summary import build_summary
+
+# Where the frontend picks up the published data
+FRONTEND_INDEX_FILE = '../frontend/src/data/placement_index.json'
+FRONTEND_SUMMARY_FILE = '../frontend/src/data/summary.json'
+FRONTEND_MESSAGE_DIR = '../frontend/public/messages'
+FRONTEND_DELTA_DIR = '../frontend/public/deltas'
+FRONTEND_SEARCH_FILE = '../frontend/src/data/search_index.json'
+
+# Messages are stored in shards named by this many leading hex digits of
+# their id: 16 files for 1, 256 for 2
+MESSAGE_SHARD_CHARS = 1
+
+# Per-company hashes of what was last published, and its version
+SNAPSHOT_FILE = 'publish_snapshot.json'
+# Deltas older than this many versions are removed; consumers that far
+# behind reload the full data instead
+MAX_DELTAS = 100
+
+
+def dump_minified(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def write_text(path, text):
+    # Readers (the backend, a dev server) never see a half-written file
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def dump_with_companies(data, companies):
+    # dump_minified(data), with its companies already serialized
+    return '{' + ','.join(
+        dump_minified(key) + ':' + ('[' + ','.join(companies) + ']' if key == "companies" else dump_minified(value))
+        for key, value in data.items()
+    ) + '}'
+
+
+def lean_record(company):
+    # The company with its raw messages swapped for their ids, and the messages by id
+    metadata = dict(company.get("metadata") or {})
+    messages = {}
+    ids = []
+    for msg in metadata.pop("raw_messages", []):
+        key = message_id(msg)
+        messages[key] = msg
+        ids.append(key)
+    metadata["message_ids"] = ids
+    return dict(company, metadata=metadata), messages
+
+
+def split_output(data):
+    """Split placement data into a lean company index and a message store.
+
+    Each company keeps only the ids of its raw messages. The store holds
+    every distinct message once, however many companies reference it,
+    sharded by the first MESSAGE_SHARD_CHARS characters of its id, so a
+    client can tell which shard holds a message from the id alone.
+    """
+    # Only metadata differs from the full data, so companies are copied one
+    # level deep and everything else is shared
+    index = dict(data, companies=[], message_shard_chars=MESSAGE_SHARD_CHARS)
+    shards = defaultdict(dict)
+    for company in data.get("companies", []):
+        lean, messages = lean_record(company)
+        for key, msg in messages.items():
+            shards[key[:MESSAGE_SHARD_CHARS]][key] = msg
+        index["companies"].append(lean)
+    return index, shards
+
+
+def write_split_output(index_text, shards, touched=None, index_file=FRONTEND_INDEX_FILE, store_dir=FRONTEND_MESSAGE_DIR):
+    """Write the serialized company index and the message shards that changed.
+
+    With `touched`, only those shards are looked at and `shards` need only
+    hold them; otherwise every shard is, and files of shards no message
+    falls in any more are removed.
+    """
+    write_text(index_file, index_text)
+
+    os.makedirs(store_dir, exist_ok=True)
+    if touched is None:
+        touched = set(shards) | {name[:-len('.json')] for name in os.listdir(store_dir) if name.endswith('.json')}
+    written = 0
+    for shard in touched:
+        path = os.path.join(store_dir, shard + '.json')
+        if shard not in shards:
+            if os.path.exists(path):
+                os.remove(path)
+            continue
+        text = dump_minified(dict(sorted(shards[shard].items())))
+        # Shards whose messages are unchanged are left alone
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                unchanged = f.read() == text
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            write_text(path, text)
+            written += 1
+
+    print(f"Wrote company index to {index_file} ({os.path.getsize(index_file)} bytes); "
+          f"{written} of {len(touched)} shards looked at changed in {store_dir}")
+
+
+def company_hash(company):
+    return hashlib.sha1(json.dumps(company, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+
+def load_snapshot(path=SNAPSHOT_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"version": 0, "companies": {}}
+
+
+def build_delta(snapshot, companies, hashes=None):
+    """Compare companies with the last published snapshot.
+
+    Returns the new snapshot and the delta taking a consumer from the
+    snapshot's version to it, or None for the delta if nothing changed.
+    `hashes` are the companies' company_hash by name, where the caller
+    kept them from an earlier publish.
+    """
+    if hashes is None:
+        hashes = {c["company_name"]: company_hash(c) for c in companies}
+    old = snapshot["companies"]
+    upserts = [c for c in companies if old.get(c["company_name"]) != hashes[c["company_name"]]]
+    deletes = [name for name in old if name not in hashes]
+    if not upserts and not deletes and snapshot["version"]:
+        return snapshot, None
+    version = snapshot["version"] + 1
+    delta = {
+        "version": version,
+        "base_version": snapshot["version"],
+        "upserts": upserts,
+        "deletes": deletes,
+    }
+    return {"version": version, "companies": hashes}, delta
+
+
+def write_delta(delta, delta_dir=FRONTEND_DELTA_DIR):
+    os.makedirs(delta_dir, exist_ok=True)
+    write_text(os.path.join(delta_dir, f"{delta['version']}.json"), dump_minified(delta))
+    versions = sorted(int(name[:-len('.json')]) for name in os.listdir(delta_dir)
+                      if name.endswith('.json') and name[:-len('.json')].isdigit())
+    for version in versions[:-MAX_DELTAS]:
+        os.remove(os.path.join(delta_dir, f'{version}.json'))
+    versions = versions[-MAX_DELTAS:]
+    # A consumer at version v applies v+1 ... version in order, if v+1 is still here
+    write_text(os.path.join(delta_dir, 'index.json'), dump_minified({"version": delta["version"], "deltas": versions}))
+    print(f"Wrote delta {delta['version']}: {len(delta['upserts'])} upserts, {len(delta['deletes'])} deletes")
+
+
+@dataclass(slots=True)
+class PublishedCompany:
+    # What publishing works out from one company, kept between publishes
+    record: dict
+    serialized: str
+    lean: dict
+    lean_serialized: str
+    hash: str
+    messages: dict
+    terms: dict
+
+
+def published_company(company):
+    record = company.to_dict() if isinstance(company, Company) else company
+    lean, messages = lean_record(record)
+    return PublishedCompany(record, dump_minified(record), lean, dump_minified(lean), company_hash(lean), messages,
+                            company_terms(record))
+
+
+class Publisher:
+    """Publishes placement data, reusing what it worked out for unchanged companies.
+
+    The first publish works everything out. Later ones are told which
+    companies `changed`: only those are converted, serialized, hashed and
+    indexed again, and only their rows in the SQLite export and the message
+    shards their messages fall in are rewritten. The placement, index,
+    summary and search files are one file each, so they are still written
+    whole, from the parts kept for every company.
+    """
+
+    def __init__(self):
+        self.parts = {}
+
+    def publish(self, data, placement_file, copy_file='media_extracted_data.json', changed=None):
+        old = self.parts
+        full = changed is None or not old
+        self.parts = {}
+        for company in data.get("companies", []):
+            name = company.company_name if isinstance(company, Company) else company["company_name"]
+            part = old.get(name)
+            if full or part is None or name in changed:
+                part = published_company(company)
+            self.parts[name] = part
+        parts = list(self.parts.values())
+        changed = set(self.parts) if full else set(changed) | (set(old) - set(self.parts))
+
+        # The companies' JSON is already serialized, so the rest is laid
+        # out around it in the same key order a plain dump gives
+        out = dict(data, companies=[])
+        index = dict(out, message_shard_chars=MESSAGE_SHARD_CHARS)
+        # Deltas carry the lean index records the frontend holds, so a client
+        # applying one still loads message text lazily from the store
+        snapshot, delta = build_delta(load_snapshot(), [p.lean for p in parts], {n: p.hash for n, p in self.parts.items()})
+        out["version"] = index["version"] = snapshot["version"]
+
+        # Saved to the backend and to the local copy; serialized once for both
+        print(f"Saving updated data to {placement_file}...")
+        serialized = dump_with_companies(out, [p.serialized for p in parts])
+        write_text(placement_file, serialized)
+        write_text(copy_file, serialized)
+
+        # Lean company index for the frontend, raw messages go to a separate
+        # store; only shards holding a message of a changed company can differ
+        touched = None if full else {
+            key[:MESSAGE_SHARD_CHARS] for name in changed for part in (old.get(name), self.parts.get(name))
+            if part for key in part.messages
+        }
+        shards = defaultdict(dict)
+        for part in parts:
+            for key, msg in part.messages.items():
+                if touched is None or key[:MESSAGE_SHARD_CHARS] in touched:
+                    shards[key[:MESSAGE_SHARD_CHARS]][key] = msg
+        write_split_output(dump_with_companies(index, [p.lean_serialized for p in parts]), shards, touched)
+
+        # Dashboard aggregates, so the frontend doesn't derive them from the full dataset
+        records = [p.record for p in parts]
+        summary = build_summary(records)
+        write_text(FRONTEND_SUMMARY_FILE, json.dumps(summary, separators=(',', ':')))
+        print(f"Wrote summary for {summary['total_companies']} companies to {FRONTEND_SUMMARY_FILE}")
+
+        # Inverted index for search in the browser, by position in the company index
+        search = build_search_index(records, [p.terms for p in parts])
+        write_text(FRONTEND_SEARCH_FILE, dump_minified(search))
+        print(f"Wrote search index of {len(search['terms'])} terms to {FRONTEND_SEARCH_FILE} "
+              f"({os.path.getsize(FRONTEND_SEARCH_FILE)} bytes)")
+
+        # Normalized, indexed copy for range and full-text queries
+        db_file = os.path.splitext(placement_file)[0] + '.db'
+        if full:
+            write_sqlite(dict(out, companies=records), db_file)
+        else:
+            update_sqlite(dict(out, companies=records), db_file, changed)
+
+        # Change set since the last publish; the snapshot goes last so an
+        # interrupted publish is redone from the older version next time
+        if delta:
+            write_delta(delta)
+            write_text(SNAPSHOT_FILE, dump_minified(snapshot))
+
+
+def publish_data(data, placement_file, copy_file='media_extracted_data.json'):
+    """Write the final placement data and everything derived from it.
+
+    Company records are turned into the JSON schema once, by the publisher;
+    everything it writes works from those dicts.
+    """
+    Publisher().publish(data, placement_file, copy_file)
@@ -0,0 +1,135 @@
+from dataclasses import dataclass, field
+
+
+# Slotted records for the extraction output. A company is eight small
+# objects with fixed attributes instead of seven nested dicts, and its raw
+# messages are the grouped message list itself rather than a copy.
+
+
+@dataclass(slots=True)
+class OfferProfile:
+    role: str
+    ctc_lpa: float = None
+
+
+@dataclass(slots=True)
+class Compensation:
+    ctc_lpa: float = None
+    base_lpa: float = None
+    variable_lpa: float = None
+    bonus_lpa: float = None
+    esop_lpa: float = None
+    stipend_monthly: float = None
+
+
+@dataclass(slots=True)
+class SelectionStats:
+    students_selected: int = None
+    students_shortlisted: int = None
+    offered_internship: int = None
+    converted_to_ppo: int = None
+
+
+@dataclass(slots=True)
+class Eligibility:
+    cgpa_cutoff: float = None
+    allowed_branches: list = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Timeline:
+    selection_date: str = None
+    internship_duration_months: float = None
+
+
+@dataclass(slots=True)
+class Flags:
+    is_result_confirmed: bool = False
+    is_withdrawn: bool = False
+    data_confidence_score: float = 0.8
+
+
+@dataclass(slots=True)
+class Company:
+    company_name: str
+    role: list = field(default_factory=list)
+    offer_profiles: list = field(default_factory=list)
+    engagement_type: list = field(default_factory=list)
+    compensation: Compensation = field(default_factory=Compensation)
+    selection_stats: SelectionStats = field(default_factory=SelectionStats)
+    eligibility: Eligibility = field(default_factory=Eligibility)
+    timeline: Timeline = field(default_factory=Timeline)
+    flags: Flags = field(default_factory=Flags)
+    notes: str = ""
+    raw_messages: list = field(default_factory=list)
+
+    def to_dict(self, raw_messages=True):
+        """The company in the published JSON schema.
+
+        Written out field by field, which is several times quicker than
+        dataclasses.asdict; lists are shared with the record, not copied.
+        Without `raw_messages` the metadata is left empty, for caches that
+        get the messages back from the export.
+        """
+        c, s, e, t, f = self.compensation, self.selection_stats, self.eligibility, self.timeline, self.flags
+        return {
+            "company_name": self.company_name,
+            "role": self.role,
+            "offer_profiles": [{"role": p.role, "ctc_lpa": p.ctc_lpa} for p in self.offer_profiles],
+            "engagement_type": self.engagement_type,
+            "compensation": {
+                "ctc_lpa": c.ctc_lpa,
+                "base_lpa": c.base_lpa,
+                "variable_lpa": c.variable_lpa,
+                "bonus_lpa": c.bonus_lpa,
+                "esop_lpa": c.esop_lpa,
+                "stipend_monthly": c.stipend_monthly,
+            },
+            "selection_stats": {
+                "students_selected": s.students_selected,
+                "students_shortlisted": s.students_shortlisted,
+                "offered_internship": s.offered_internship,
+                "converted_to_ppo": s.converted_to_ppo,
+            },
+            "eligibility": {
+                "cgpa_cutoff": e.cgpa_cutoff,
+                "allowed_branches": e.allowed_branches,
+            },
+            "timeline": {
+                "selection_date": t.selection_date,
+                "internship_duration_months": t.internship_duration_months,
+            },
+            "flags": {
+                "is_result_confirmed": f.is_result_confirmed,
+                "is_withdrawn": f.is_withdrawn,
+                "data_confidence_score": f.data_confidence_score,
+            },
+            "notes": self.notes,
+            "metadata": {"raw_messages": self.raw_messages} if raw_messages else {},
+        }
+
+    @classmethod
+    def from_dict(cls, data, raw_messages=None):
+        # `raw_messages` replaces whatever the dict holds, e.g. the grouped
+        # messages a cached company was parsed from
+        if raw_messages is None:
+            raw_messages = (data.get("metadata") or {}).get("raw_messages") or []
+        eligibility = data["eligibility"]
+        return cls(
+            company_name=data["company_name"],
+            role=list(data["role"]),
+            offer_profiles=[OfferProfile(p["role"], p.get("ctc_lpa")) for p in data["offer_profiles"]],
+            engagement_type=list(data["engagement_type"]),
+            compensation=Compensation(**data["compensation"]),
+            selection_stats=SelectionStats(**data["selection_stats"]),
+            eligibility=Eligibility(eligibility.get("cgpa_cutoff"), list(eligibility.get("allowed_branches") or [])),
+            timeline=Timeline(**data["timeline"]),
+            flags=Flags(**data["flags"]),
+            notes=data.get("notes") or "",
+            raw_messages=raw_messages,
+        )
+
+
+def companies_to_dicts(data):
+    # Placement data with its company records in the JSON schema, for publishing
+    return dict(data, companies=[c.to_dict() if isinstance(c, Company) else c for c in data.get("companies", [])])
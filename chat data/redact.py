@@ -0,0 +1,122 @@
+import mmap
+import os
+import re
+import sys
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+RedactionRule = namedtuple('RedactionRule', 'kind pattern replacement')
+
+EMAIL = r'[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+'
+
+# A number that runs on into an address belongs to the email, which used to be
+# replaced first. That includes a number directly followed by the '@', as in
+# '9876543210@gmail.com'.
+NOT_IN_EMAIL = r'(?![a-zA-Z0-9_.+-]*@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.])'
+
+PII_RULES = [
+    # Only tried where a run of address characters starts, instead of at every
+    # letter of every word. A domain stops at '_' or '+', where the old pass
+    # could start the next address, so those are tried too; any other start
+    # inside a run reaches the same '@' and can't match where the run's own
+    # start didn't.
+    RedactionRule('email', r'(?:(?=[_+])|(?<![a-zA-Z0-9_.+-]))' + EMAIL, '[EMAIL]'),
+    # With or without +91; this also covers bare ten digit numbers
+    RedactionRule('phone', r'(?:\+?91[\-\s]?)?[6789]\d{4}[\-\s]?\d{5}' + NOT_IN_EMAIL, '[PHONE]'),
+]
+
+# Messages also lose their leading '27/09/25, 3:28 pm - +91 98043 64389: '
+MESSAGE_RULES = [
+    RedactionRule('header', r'\A\d{2}/\d{2}/\d{2}, \d{1,2}:\d{2}\s?(?:am|pm)\s-\s(?:[^:]+): ', ''),
+] + PII_RULES
+
+# Chunks end right before a line starting with a message timestamp, so no
+# email or phone number is ever split between two chunks
+BOUNDARY_RE = re.compile(rb'\n(?=\d{1,2}/\d{1,2}/\d{2,4}, \d{1,2}:\d{2})')
+
+CHUNK_SIZE = 16 * 1024 * 1024
+
+
+class Redactor:
+    """Replaces PII with typed tokens in a single regex pass.
+
+    The rules are compiled into one alternation of named groups, tried in
+    order at each position, and the group that matched picks the
+    replacement. Matches are counted per kind in `counts`.
+    """
+
+    def __init__(self, rules=PII_RULES):
+        self.replacements = {rule.kind: rule.replacement for rule in rules}
+        self.pattern = re.compile('|'.join(f'(?P<{rule.kind}>{rule.pattern})' for rule in rules))
+        self.counts = Counter()
+
+    def _replace(self, match):
+        self.counts[match.lastgroup] += 1
+        return self.replacements[match.lastgroup]
+
+    def redact(self, text):
+        return self.pattern.sub(self._replace, text)
+
+
+def chunk_bounds(data, chunk_size=CHUNK_SIZE):
+    """Split `data` into (start, end) ranges of about `chunk_size` on message boundaries."""
+    bounds = []
+    start = 0
+    while start < len(data):
+        match = BOUNDARY_RE.search(data, start + chunk_size) if start + chunk_size < len(data) else None
+        end = match.start() if match else len(data)
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def redact_range(path, start, end, rules=PII_RULES):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+    redactor = Redactor(rules)
+    return redactor.redact(text).encode('utf-8'), redactor.counts
+
+
+def redact_file(src, dst, workers=None, chunk_size=CHUNK_SIZE, rules=PII_RULES):
+    """Redact the export at `src` into `dst`, returning counts per PII kind.
+
+    With workers=1 the file is redacted chunk by chunk in this process;
+    otherwise the chunks are spread over a process pool. Chunks are written
+    back in file order, so both produce the same bytes.
+    """
+    started = time.perf_counter()
+    with open(src, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                bounds = chunk_bounds(data, chunk_size)
+        else:
+            bounds = []
+
+    counts = Counter()
+    args = ([src] * len(bounds), [s for s, _ in bounds], [e for _, e in bounds], [rules] * len(bounds))
+    pool = ProcessPoolExecutor(max_workers=workers) if workers != 1 and len(bounds) > 1 else None
+    tmp = f'{dst}.{os.getpid()}.tmp'
+    try:
+        with open(tmp, 'wb') as out:
+            for redacted, chunk_counts in (pool.map if pool else map)(redact_range, *args):
+                out.write(redacted)
+                counts.update(chunk_counts)
+    finally:
+        if pool:
+            pool.shutdown()
+    os.replace(tmp, dst)
+
+    elapsed = time.perf_counter() - started
+    rate = size / (1024 * 1024) / elapsed if elapsed else 0
+    found = ', '.join(f'{counts[rule.kind]} {rule.kind}' for rule in rules)
+    print(f"Redacted {size} bytes in {len(bounds)} chunks, {elapsed:.2f}s ({rate:.1f} MB/s): {found}")
+    return counts
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        sys.exit("usage: redact.py SOURCE DEST [WORKERS]")
+    redact_file(sys.argv[1], sys.argv[2], int(sys.argv[3]) if len(sys.argv) > 3 else None)
@@ -0,0 +1,79 @@
+import json
+import re
+import sys
+from collections import defaultdict
+
+TOKEN_RE = re.compile(r'[^\W_]+')
+# Single characters would match nearly every company; a one-letter query
+# still works as a prefix of the longer terms
+MIN_TERM_LENGTH = 2
+# Longer tokens mixing letters and digits are link slugs and form ids,
+# which nobody types into a search box
+ID_LIKE_RE = re.compile(r'(?=.*\d)(?=.*[^\W\d_]).{9,}')
+
+# Each posting is company_id * 8 + the bits of the fields the term occurs in
+FIELDS = {"name": 1, "role": 2, "message": 4}
+FIELD_SHIFT = 3
+
+
+def terms(text):
+    return {t for t in TOKEN_RE.findall(text.lower()) if len(t) >= MIN_TERM_LENGTH and not ID_LIKE_RE.fullmatch(t)}
+
+
+def company_texts(company):
+    roles = list(company.get("role") or [])
+    roles.extend(p["role"] for p in company.get("offer_profiles") or [])
+    return [
+        ("name", [company["company_name"]]),
+        ("role", roles),
+        ("message", (company.get("metadata") or {}).get("raw_messages") or []),
+    ]
+
+
+def company_terms(company):
+    """{term: bits of the fields it occurs in} for one company."""
+    found = {}
+    for field, texts in company_texts(company):
+        bit = FIELDS[field]
+        for text in texts:
+            for term in terms(text):
+                found[term] = found.get(term, 0) | bit
+    return found
+
+
+def build_search_index(companies, company_term_maps=None):
+    """Inverted index over company names, roles, offer profiles and raw messages.
+
+    Company ids are positions in `companies`, which is also the order of the
+    published company index. Terms are sorted so a client can find every
+    term starting with a prefix by binary search, then union their postings;
+    a lookup costs the terms and postings it matches, not the dataset.
+    `company_term_maps` are company_terms of each company, where the caller
+    kept them from an earlier build.
+    """
+    if company_term_maps is None:
+        company_term_maps = map(company_terms, companies)
+    postings = defaultdict(dict)
+    for company_id, found in enumerate(company_term_maps):
+        for term, bits in found.items():
+            postings[term][company_id] = bits
+
+    # In UTF-16 order, which is how JavaScript compares strings
+    ordered = sorted(postings, key=lambda t: t.encode('utf-16-be'))
+    return {
+        "fields": FIELDS,
+        "field_shift": FIELD_SHIFT,
+        "terms": ordered,
+        "postings": [[cid << FIELD_SHIFT | bits for cid, bits in sorted(postings[t].items())] for t in ordered],
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        sys.exit("usage: search_index.py PLACEMENT_FILE OUTPUT")
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        placement = json.load(f)
+    index = build_search_index(placement.get("companies", []))
+    with open(sys.argv[2], 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    print(f"Indexed {len(index['terms'])} terms to {sys.argv[2]}")
@@ -0,0 +1,249 @@
+import json
+import os
+import sqlite3
+import sys
+
+from parse_cache import message_id
+
+PLACEMENT_FILE = '../backend/data/placement_data.json'
+
+SCHEMA = """
+CREATE TABLE companies (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    ctc_lpa REAL,
+    base_lpa REAL,
+    variable_lpa REAL,
+    bonus_lpa REAL,
+    esop_lpa REAL,
+    stipend_monthly REAL,
+    students_selected INTEGER,
+    students_shortlisted INTEGER,
+    offered_internship INTEGER,
+    converted_to_ppo INTEGER,
+    selection_date TEXT,
+    internship_duration_months REAL,
+    is_result_confirmed INTEGER NOT NULL,
+    is_withdrawn INTEGER NOT NULL,
+    data_confidence_score REAL,
+    notes TEXT
+);
+CREATE TABLE roles (
+    company_id INTEGER NOT NULL REFERENCES companies(id),
+    role TEXT NOT NULL
+);
+CREATE TABLE engagements (
+    company_id INTEGER NOT NULL REFERENCES companies(id),
+    engagement_type TEXT NOT NULL
+);
+CREATE TABLE offer_profiles (
+    id INTEGER PRIMARY KEY,
+    company_id INTEGER NOT NULL REFERENCES companies(id),
+    role TEXT NOT NULL,
+    ctc_lpa REAL
+);
+CREATE TABLE eligibility (
+    company_id INTEGER PRIMARY KEY REFERENCES companies(id),
+    cgpa_cutoff REAL
+);
+CREATE TABLE eligible_branches (
+    company_id INTEGER NOT NULL REFERENCES companies(id),
+    branch TEXT NOT NULL
+);
+CREATE TABLE messages (
+    id INTEGER PRIMARY KEY,
+    message_id TEXT NOT NULL UNIQUE,
+    text TEXT NOT NULL
+);
+CREATE TABLE company_messages (
+    company_id INTEGER NOT NULL REFERENCES companies(id),
+    message_id INTEGER NOT NULL REFERENCES messages(id),
+    position INTEGER NOT NULL
+);
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE unresolved_conflicts (
+    company_name TEXT NOT NULL,
+    field TEXT NOT NULL,
+    chosen TEXT,
+    "values" TEXT NOT NULL
+);
+"""
+
+# Built after the rows are in, which is quicker than maintaining them row by row
+INDEXES = """
+CREATE INDEX companies_ctc ON companies(ctc_lpa);
+CREATE INDEX offer_profiles_ctc ON offer_profiles(ctc_lpa);
+CREATE INDEX offer_profiles_company ON offer_profiles(company_id);
+CREATE INDEX eligibility_cgpa ON eligibility(cgpa_cutoff);
+CREATE INDEX engagements_type ON engagements(engagement_type, company_id);
+CREATE INDEX eligible_branches_branch ON eligible_branches(branch, company_id);
+CREATE INDEX roles_company ON roles(company_id);
+CREATE INDEX company_messages_company ON company_messages(company_id, position);
+CREATE INDEX company_messages_message ON company_messages(message_id);
+CREATE VIRTUAL TABLE messages_fts USING fts5(text, content='messages', content_rowid='id');
+INSERT INTO messages_fts(messages_fts) VALUES ('rebuild');
+"""
+
+
+def company_row(company_id, company):
+    comp = company.get("compensation") or {}
+    stats = company.get("selection_stats") or {}
+    timeline = company.get("timeline") or {}
+    flags = company.get("flags") or {}
+    return (
+        company_id, company["company_name"],
+        comp.get("ctc_lpa"), comp.get("base_lpa"), comp.get("variable_lpa"),
+        comp.get("bonus_lpa"), comp.get("esop_lpa"), comp.get("stipend_monthly"),
+        stats.get("students_selected"), stats.get("students_shortlisted"),
+        stats.get("offered_internship"), stats.get("converted_to_ppo"),
+        timeline.get("selection_date"), timeline.get("internship_duration_months"),
+        int(bool(flags.get("is_result_confirmed"))), int(bool(flags.get("is_withdrawn"))),
+        flags.get("data_confidence_score"), company.get("notes") or None,
+    )
+
+
+def company_tables(company_id, company):
+    # Rows of the per-company tables, in the order they are inserted below
+    elig = company.get("eligibility") or {}
+    return (
+        [(company_id, r) for r in company.get("role") or []],
+        [(company_id, e) for e in company.get("engagement_type") or []],
+        [(company_id, p["role"], p.get("ctc_lpa")) for p in company.get("offer_profiles") or []],
+        [(company_id, elig.get("cgpa_cutoff"))],
+        [(company_id, b) for b in elig.get("allowed_branches") or []],
+    )
+
+
+def insert_company_tables(conn, tables):
+    roles, engagements, profiles, eligibility, branches = tables
+    conn.executemany("INSERT INTO roles VALUES (?, ?)", roles)
+    conn.executemany("INSERT INTO engagements VALUES (?, ?)", engagements)
+    conn.executemany("INSERT INTO offer_profiles (company_id, role, ctc_lpa) VALUES (?, ?, ?)", profiles)
+    conn.executemany("INSERT INTO eligibility VALUES (?, ?)", eligibility)
+    conn.executemany("INSERT INTO eligible_branches VALUES (?, ?)", branches)
+
+
+def conflict_rows(data):
+    return [(c.get("company_name"), c.get("field"), json.dumps(c.get("chosen")), json.dumps(c.get("values")))
+            for c in data.get("unresolved_conflicts", [])]
+
+
+def write_sqlite(data, path):
+    """Export placement data to a normalized SQLite database at `path`.
+
+    The database is built under a temporary name and renamed into place, so
+    readers keep the previous file until the new one is complete. Raw
+    messages (already redacted) are stored once each and indexed with FTS5.
+    """
+    tmp = f'{path}.{os.getpid()}.tmp'
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.executescript(SCHEMA)
+        companies, links = [], []
+        tables = ([], [], [], [], [])
+        messages = {}
+        for company_id, company in enumerate(data.get("companies", []), 1):
+            companies.append(company_row(company_id, company))
+            for rows, new in zip(tables, company_tables(company_id, company)):
+                rows.extend(new)
+            raw = (company.get("metadata") or {}).get("raw_messages") or []
+            for position, text in enumerate(raw):
+                row_id = messages.setdefault(message_id(text), (len(messages) + 1, text))[0]
+                links.append((company_id, row_id, position))
+
+        conn.executemany(f"INSERT INTO companies VALUES ({', '.join('?' * 18)})", companies)
+        insert_company_tables(conn, tables)
+        conn.executemany("INSERT INTO messages VALUES (?, ?, ?)",
+                         ((row_id, key, text) for key, (row_id, text) in messages.items()))
+        conn.executemany("INSERT INTO company_messages VALUES (?, ?, ?)", links)
+        conn.executemany("INSERT INTO unresolved_conflicts VALUES (?, ?, ?, ?)", conflict_rows(data))
+        conn.execute("INSERT INTO meta VALUES ('version', ?)", (str(data.get("version")),))
+        conn.executescript(INDEXES)
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp, path)
+    print(f"Wrote {len(companies)} companies and {len(messages)} messages to {path}")
+
+
+def update_sqlite(data, path, changed):
+    """Bring the database at `path` up to date when only the `changed` companies differ.
+
+    Their rows are replaced, companies no longer in `data` are dropped and
+    messages nothing links to any more are removed, all in one transaction,
+    so readers see the old or the new data and never a mix. Without a
+    database to update it is written whole.
+    """
+    if not os.path.exists(path):
+        write_sqlite(data, path)
+        return
+    companies = {c["company_name"]: c for c in data.get("companies", [])}
+    conn = sqlite3.connect(path)
+    try:
+        ids = dict(conn.execute("SELECT name, id FROM companies"))
+        replaced = [name for name in ids if name in changed or name not in companies]
+        old_ids = [ids[name] for name in replaced]
+        placeholders = ', '.join('?' * len(old_ids))
+        orphans = {row[0] for row in conn.execute(
+            f"SELECT message_id FROM company_messages WHERE company_id IN ({placeholders})", old_ids)}
+        for table in ("roles", "engagements", "offer_profiles", "eligibility", "eligible_branches",
+                      "company_messages"):
+            conn.execute(f"DELETE FROM {table} WHERE company_id IN ({placeholders})", old_ids)
+        conn.execute(f"DELETE FROM companies WHERE id IN ({placeholders})", old_ids)
+
+        next_id = max(ids.values(), default=0) + 1
+        written = added = 0
+        for name in changed:
+            company = companies.get(name)
+            if company is None:
+                continue
+            # Kept ids stay stable for anyone holding one
+            company_id = ids.get(name)
+            if company_id is None:
+                company_id, next_id = next_id, next_id + 1
+            conn.execute(f"INSERT INTO companies VALUES ({', '.join('?' * 18)})", company_row(company_id, company))
+            insert_company_tables(conn, company_tables(company_id, company))
+            written += 1
+            raw = (company.get("metadata") or {}).get("raw_messages") or []
+            for position, text in enumerate(raw):
+                key = message_id(text)
+                row = conn.execute("SELECT id FROM messages WHERE message_id = ?", (key,)).fetchone()
+                if row is None:
+                    row_id = conn.execute("INSERT INTO messages (message_id, text) VALUES (?, ?)",
+                                          (key, text)).lastrowid
+                    conn.execute("INSERT INTO messages_fts(rowid, text) VALUES (?, ?)", (row_id, text))
+                    added += 1
+                else:
+                    row_id = row[0]
+                conn.execute("INSERT INTO company_messages VALUES (?, ?, ?)", (company_id, row_id, position))
+
+        # Messages only the replaced companies linked to, and no longer do
+        removed = 0
+        for row_id in orphans:
+            if conn.execute("SELECT 1 FROM company_messages WHERE message_id = ?", (row_id,)).fetchone():
+                continue
+            text = conn.execute("SELECT text FROM messages WHERE id = ?", (row_id,)).fetchone()[0]
+            conn.execute("INSERT INTO messages_fts(messages_fts, rowid, text) VALUES ('delete', ?, ?)", (row_id, text))
+            conn.execute("DELETE FROM messages WHERE id = ?", (row_id,))
+            removed += 1
+
+        conn.execute("DELETE FROM unresolved_conflicts")
+        conn.executemany("INSERT INTO unresolved_conflicts VALUES (?, ?, ?, ?)", conflict_rows(data))
+        conn.execute("UPDATE meta SET value = ? WHERE key = 'version'", (str(data.get("version")),))
+        conn.commit()
+    finally:
+        conn.close()
+    dropped = sum(name not in companies for name in replaced)
+    print(f"Updated {written} companies and dropped {dropped} in {path}; {added} messages added, {removed} removed")
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else PLACEMENT_FILE
+    with open(source, 'r', encoding='utf-8') as f:
+        placement = json.load(f)
+    write_sqlite(placement, sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(source)[0] + '.db')
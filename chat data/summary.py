@@ -0,0 +1,99 @@
+import json
+import sys
+
+# Where the dashboard imports it from
+SUMMARY_FILE = '../frontend/src/data/summary.json'
+
+# Upper bounds (exclusive) of the package histogram buckets, in LPA
+PACKAGE_BUCKETS = [
+    ("< 5 LPA", 5),
+    ("5 - 10 LPA", 10),
+    ("10 - 20 LPA", 20),
+    ("20+ LPA", None),
+]
+
+ENGAGEMENT_ALIASES = {
+    "full_time_count": ("Full Time", "FTE"),
+    "internship_count": ("Internship", "Intern"),
+    "ppo_count": ("PPO",),
+}
+
+
+def weighted_median(pairs):
+    # Median of the values repeated `weight` times each, without expanding them
+    pairs = sorted(p for p in pairs if p[1] > 0)
+    total = sum(w for _, w in pairs)
+    if not total:
+        return 0
+    lower_rank = (total - 1) // 2
+    upper_rank = total // 2
+    lower = upper = None
+    seen = 0
+    for value, weight in pairs:
+        seen += weight
+        if lower is None and seen > lower_rank:
+            lower = value
+        if seen > upper_rank:
+            upper = value
+            break
+    return round((lower + upper) / 2, 2)
+
+
+def bucket_for(ctc):
+    for label, bound in PACKAGE_BUCKETS:
+        if bound is None or ctc < bound:
+            return label
+
+
+def build_summary(companies):
+    """Dashboard aggregates, computed once per company instead of once per selected student."""
+    total_selections = 0
+    ctcs = []
+    weighted = []
+    histogram = {label: 0 for label, _ in PACKAGE_BUCKETS}
+    engagement_counts = {key: 0 for key in ENGAGEMENT_ALIASES}
+
+    for company in companies:
+        stats = company.get("selection_stats") or {}
+        selected = stats.get("students_selected") or stats.get("students_shortlisted") or 0
+        total_selections += selected
+
+        ctc = (company.get("compensation") or {}).get("ctc_lpa") or 0
+        if ctc > 0:
+            ctcs.append(ctc)
+            weighted.append((ctc, selected))
+            histogram[bucket_for(ctc)] += selected
+
+        engagements = set(company.get("engagement_type") or [])
+        for key, names in ENGAGEMENT_ALIASES.items():
+            if engagements.intersection(names):
+                engagement_counts[key] += 1
+
+    summary = {
+        "total_companies_visited": len(companies),
+        "total_companies": len(companies),
+        "total_selections": total_selections,
+        "total_offers": total_selections,
+        "highest_package_lpa": max(ctcs, default=0),
+        "average_package_lpa": round(sum(ctcs) / len(ctcs), 2) if ctcs else 0,
+        "median_package_lpa": weighted_median(weighted),
+    }
+    summary.update(engagement_counts)
+    summary["package_histogram"] = [
+        {"range": label, "count": count} for label, count in histogram.items() if count
+    ]
+    return summary
+
+
+def write_summary(placement_file, summary_file=SUMMARY_FILE):
+    with open(placement_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    summary = build_summary(data.get("companies", []))
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, separators=(',', ':'))
+    print(f"Wrote summary for {summary['total_companies']} companies to {summary_file}")
+    return summary
+
+
+if __name__ == "__main__":
+    write_summary(*sys.argv[1:3] or ['placement_data.json'])
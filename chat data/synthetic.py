@@ -0,0 +1,237 @@
+import os
+import random
+import sys
+import zipfile
+from datetime import datetime, timedelta
+from xml.sax.saxutils import escape
+
+from group_by_company import aliases, companies
+
+# Messages and media files in a 1x export, about the size of the sample chat
+BASE_MESSAGES = 160
+BASE_MEDIA = 12
+
+MEDIA_TYPES = ('xlsx', 'docx', 'pdf')
+
+ROLES = [
+    "Software Engineer", "Senior Software Engineer", "Systems Engineer",
+    "Digital Specialist Engineer", "Specialist Programmer", "Data Analyst",
+    "Graduate Engineer Trainee", "Associate Consultant", "Power Programmer",
+]
+BRANCHES = ["CSE", "IT", "ECE", "EE", "ME", "CSE (AIML)", "CSBS"]
+ENGAGEMENTS = ["Full Time", "Internship", "Internship + PPO", "FTE"]
+FIRST_NAMES = ["Aheli", "Pritam", "Sumit", "Ishaan", "Rishik", "Ananya", "Riya", "Arup"]
+FILLER = [
+    "Kindly keep your resumes updated on the portal.",
+    "Students are requested to carry their college ID cards.",
+    "Please join the pre-placement talk on time.",
+    "The link will be shared shortly.",
+    "Dress code: formals.",
+]
+CHATTER = [
+    "Please fill the Google form for the training session by tonight.",
+    "Reminder: the mock aptitude test starts at 10 am tomorrow.",
+    "All students must update their semester marks on the portal.",
+    "The seminar hall has been changed to Room 203.",
+]
+
+
+class SyntheticChat:
+    """Seeded generator of '---' separated chat exports and media files.
+
+    Messages cover the shapes the parser handles: registration notices with
+    CGPA cutoffs and branches, multi-role LPA tables, shortlists, results
+    with stipends and counts, reminders reposting an earlier notice, and
+    chatter that names no company. Headers and bodies carry phone numbers
+    and emails so redaction has work to do.
+    """
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        self.mentions = companies + list(aliases)
+        self.clock = datetime(2025, 7, 1, 9, 0)
+        self.recent = []
+
+    def phone(self):
+        digits = str(self.rng.choice('6789')) + ''.join(self.rng.choice('0123456789') for _ in range(9))
+        return self.rng.choice([f"+91 {digits[:5]} {digits[5:]}", digits, f"+91{digits}"])
+
+    def email(self):
+        return f"{self.rng.choice(FIRST_NAMES).lower()}.{self.rng.randrange(1000)}@example.com"
+
+    def header(self):
+        self.clock += timedelta(minutes=self.rng.randrange(1, 600))
+        # Newer exports put a narrow no-break space before am/pm
+        space = self.rng.choice([' ', '\u202f'])
+        stamp = self.clock.strftime('%d/%m/%y, ') + self.clock.strftime('%I:%M').lstrip('0') + space
+        return f"{stamp}{self.clock.strftime('%p').lower()} - {self.phone()}: "
+
+    def lpa(self):
+        return self.rng.choice([3.6, 4.25, 5.75, 6.5, 7.5, 9.5, 12, 16, 21])
+
+    def notice(self, company):
+        branches = ", ".join(self.rng.sample(BRANCHES, self.rng.randint(2, 5)))
+        return (f"*Important Notification for {company} campus hiring 2026*\n"
+                f"Role: {self.rng.choice(ROLES)} ({self.rng.choice(ENGAGEMENTS)})\n"
+                f"Eligibility: {self.rng.choice([6, 6.5, 7, 7.5])} CGPA and above\n"
+                f"Eligible branches: {branches}\n"
+                f"CTC: {self.lpa()} LPA\n"
+                f"{self.rng.choice(FILLER)}\n"
+                f"For queries write to {self.email()} or call {self.phone()}.")
+
+    def role_table(self, company):
+        lines = [f"*{company} - Roles and compensation*", ""]
+        for role in self.rng.sample(ROLES, self.rng.randint(2, 4)):
+            sep = self.rng.choice([': ₹', ' - ', ': Rs. ', ' : INR '])
+            lines.append(f"{role}{sep}{self.lpa()} LPA")
+        lines.append("")
+        lines.append(self.rng.choice(FILLER))
+        return "\n".join(lines)
+
+    def shortlist(self, company):
+        return (f"*{company} - Shortlist*\n\n"
+                f"{self.rng.randint(5, 200)} students have been shortlisted for the next round.\n"
+                f"The list is attached. {self.rng.choice(FILLER)}")
+
+    def result(self, company):
+        stipend = self.rng.choice([15000, 20000, 25000, 40000])
+        return (f"Congratulations to the {self.rng.randint(1, 60)} students selected for {company} "
+                f"as {self.rng.choice(ROLES)} ({self.rng.choice(ENGAGEMENTS)}).\n"
+                f"Stipend of Rs. {stipend}/- per month during the internship, "
+                f"PPO based on performance.")
+
+    def message(self):
+        kind = self.rng.random()
+        if kind < 0.08 and self.recent:
+            body = "*REMINDER*\n" + self.rng.choice(self.recent)
+        elif kind < 0.2:
+            body = self.rng.choice(CHATTER)
+        else:
+            company = self.rng.choice(self.mentions)
+            make = self.rng.choice([self.notice, self.notice, self.role_table, self.shortlist, self.result])
+            body = make(company)
+            self.recent = (self.recent + [body])[-20:]
+        return self.header() + body
+
+    def write_export(self, path, count):
+        with open(path, 'w', encoding='utf-8') as f:
+            for i in range(count):
+                if i:
+                    f.write('\n---\n')
+                f.write(self.message())
+        return count
+
+    def write_media(self, directory, count, types=MEDIA_TYPES):
+        os.makedirs(directory, exist_ok=True)
+        written = []
+        for i in range(count):
+            company = self.rng.choice(companies).replace(' ', '_')
+            kind = types[i % len(types)]
+            if kind == 'xlsx':
+                label = self.rng.choice(['Shortlist', 'Final_Selects', 'Selected'])
+                path = os.path.join(directory, f"{company}_{label}_{i}.xlsx")
+                write_xlsx(path, [["Name", "Roll", "Branch"]] + [
+                    [f"Student {n}", str(1000 + n), self.rng.choice(BRANCHES)]
+                    for n in range(self.rng.randint(5, 150))
+                ])
+            else:
+                path = os.path.join(directory, f"{company}_JD_{i}.{kind}")
+                lines = [
+                    f"{company.replace('_', ' ')} - Job Description",
+                    f"Eligibility: {self.rng.choice([6, 6.5, 7])} CGPA throughout",
+                    f"Branches: {', '.join(self.rng.sample(BRANCHES, 3))}",
+                    f"Compensation: {self.lpa()} LPA",
+                ] + self.rng.sample(FILLER, 3)
+                (write_docx if kind == 'docx' else write_pdf)(path, lines)
+            written.append(path)
+        return written
+
+
+def write_xlsx(path, rows):
+    # The smallest workbook xlsx_rows (and Excel) will open, with inline strings
+    cells = []
+    for r, row in enumerate(rows, 1):
+        values = ''.join(f'<c t="inlineStr"><is><t>{escape(v)}</t></is></c>' for v in row)
+        cells.append(f'<row r="{r}">{values}</row>')
+    main = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+    rel = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+    pkg = 'http://schemas.openxmlformats.org/package/2006/relationships'
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as z:
+        z.writestr('[Content_Types].xml',
+                   '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                   '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                   '<Default Extension="xml" ContentType="application/xml"/>'
+                   '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+                   '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                   '</Types>')
+        z.writestr('_rels/.rels',
+                   f'<Relationships xmlns="{pkg}"><Relationship Id="rId1" Target="xl/workbook.xml" '
+                   f'Type="{rel}/officeDocument"/></Relationships>')
+        z.writestr('xl/workbook.xml',
+                   f'<workbook xmlns="{main}" xmlns:r="{rel}"><sheets>'
+                   f'<sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets></workbook>')
+        z.writestr('xl/_rels/workbook.xml.rels',
+                   f'<Relationships xmlns="{pkg}"><Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+                   f'Type="{rel}/worksheet"/></Relationships>')
+        z.writestr('xl/worksheets/sheet1.xml',
+                   f'<worksheet xmlns="{main}"><sheetData>{"".join(cells)}</sheetData></worksheet>')
+
+
+def write_docx(path, lines):
+    w = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+    paragraphs = ''.join(f'<w:p><w:r><w:t>{escape(line)}</w:t></w:r></w:p>' for line in lines)
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as z:
+        z.writestr('[Content_Types].xml',
+                   '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                   '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                   '<Default Extension="xml" ContentType="application/xml"/>'
+                   '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+                   '</Types>')
+        z.writestr('_rels/.rels',
+                   '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                   '<Relationship Id="rId1" Target="word/document.xml" '
+                   'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+                   '</Relationships>')
+        z.writestr('word/document.xml', f'<w:document xmlns:w="{w}"><w:body>{paragraphs}</w:body></w:document>')
+
+
+def write_pdf(path, lines):
+    # One page of Helvetica text; offsets in the xref table are computed as we go
+    escaped = [line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') for line in lines]
+    text = ' '.join(f'({line}) Tj 0 -16 Td' for line in escaped)
+    stream = f'BT /F1 11 Tf 50 780 Td {text} ET'.encode('latin-1', 'replace')
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+        b'/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>',
+        b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    with open(path, 'wb') as f:
+        f.write(out)
+
+
+def generate(directory, scale=1, seed=0, media_types=MEDIA_TYPES):
+    """Write filtered.txt and media/ for a `scale`x synthetic export into `directory`."""
+    os.makedirs(directory, exist_ok=True)
+    chat = SyntheticChat(seed)
+    messages = chat.write_export(os.path.join(directory, 'filtered.txt'), BASE_MESSAGES * scale)
+    media = chat.write_media(os.path.join(directory, 'media'), BASE_MEDIA * scale, media_types) if media_types else []
+    return messages, len(media)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: synthetic.py DIRECTORY [SCALE] [SEED]")
+    messages, media = generate(sys.argv[1], *(int(a) for a in sys.argv[2:4]))
+    print(f"Wrote {messages} messages and {media} media files to {sys.argv[1]}")
@@ -0,0 +1,26 @@
+from chat_reader import ChatExport
+
+
+def test_index_of_a_grown_export_is_extended(tmp_path):
+    path = tmp_path / 'chat.txt'
+    path.write_text('27/09/25, 3:28 pm - A: first\n---\n27/09/25, 3:29 pm - B: second', encoding='utf-8')
+    with ChatExport(str(path)) as export:
+        assert len(export) == 2
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(' continued\n---\n27/09/25, 3:30 pm - C: third')
+
+    with ChatExport(str(path)) as export:
+        assert export.offsets == export.build_index()
+        assert list(export) == ['27/09/25, 3:28 pm - A: first', '\n27/09/25, 3:29 pm - B: second continued',
+                                '\n27/09/25, 3:30 pm - C: third']
+
+
+def test_index_of_an_edited_export_is_rebuilt(tmp_path):
+    path = tmp_path / 'chat.txt'
+    path.write_text('first\n---\nsecond', encoding='utf-8')
+    with ChatExport(str(path)) as export:
+        assert len(export) == 2
+    path.write_text('first\n---\nsecund\n---\nthird', encoding='utf-8')
+
+    with ChatExport(str(path)) as export:
+        assert [export[i] for i in range(len(export))] == ['first', '\nsecund', '\nthird']
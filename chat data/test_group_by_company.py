@@ -0,0 +1,48 @@
+import random
+
+from group_by_company import ExportGrouper, group_export
+
+TEMPLATE = ("Dear students, {} is conducting an off-campus drive for the 2026 batch. "
+            "Eligible branches are CSE, IT and ECE with a CGPA of 7 and above. "
+            "Register through the portal before Friday and carry your college ID card.")
+
+
+def write_export(path, bodies):
+    path.write_text('\n---\n'.join(f'27/09/25, 3:{28 + i} pm - Placement Cell: {body}'
+                                   for i, body in enumerate(bodies)), encoding='utf-8')
+    return str(path)
+
+
+def test_template_notices_for_different_companies_stay_apart(tmp_path):
+    tcs, infosys = TEMPLATE.format("TCS"), TEMPLATE.format("Infosys")
+    grouped, occurrences, unassigned = group_export(write_export(tmp_path / 'chat.txt', [tcs, infosys]))
+    assert sorted(grouped) == ["Infosys", "TCS"]
+    assert [msg.endswith(tcs) for msg in grouped["TCS"]] == [True]
+    assert [msg.endswith(infosys) for msg in grouped["Infosys"]] == [True]
+    assert occurrences == {}
+
+
+def test_reposts_of_one_notice_are_collapsed(tmp_path):
+    tcs = TEMPLATE.format("TCS")
+    grouped, occurrences, unassigned = group_export(write_export(tmp_path / 'chat.txt', [tcs, tcs + ' Reminder!']))
+    assert [msg.endswith(tcs) for msg in grouped["TCS"]] == [True]
+    assert list(occurrences.values()) == [["2025-09-27T15:28", "2025-09-27T15:29"]]
+
+
+def test_grouping_one_message_at_a_time_matches_grouping_them_all():
+    # Dropped words make copies that bridge groups formed earlier
+    rng = random.Random(0)
+    grouper = ExportGrouper()
+    for _ in range(300):
+        words = TEMPLATE.format(rng.choice(["TCS", "Infosys"])).split()
+        for _ in range(rng.randint(0, 6)):
+            del words[rng.randrange(len(words))]
+        before = {name: list(messages) for name, messages in grouper.grouped.items()}
+        changed = grouper.add(' '.join(words))
+        assert {name for name, messages in grouper.grouped.items() if messages != before[name]} <= changed
+
+    canonical = [grouper.messages[group[0]] for group in grouper.duplicates.groups()]
+    grouped = grouper.result()[0]
+    assert sorted(grouped) == ["Infosys", "TCS"]
+    for name, messages in grouped.items():
+        assert messages == [msg for msg in canonical if name in msg.split()]
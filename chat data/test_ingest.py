@@ -0,0 +1,24 @@
+from extract_data import parse_company
+from ingest import merge_results
+
+RESULT = "Congratulations! Final selection 12 students selected for TCS Digital. Well done everyone, offer letters follow."
+SECOND = "Second batch result: Selection 5 students selected for TCS Ninja from the other group today."
+
+
+def result(*messages):
+    return {"companies": [parse_company("TCS", list(messages))], "unresolved_conflicts": []}
+
+
+def test_forwarded_notice_is_counted_once():
+    first, second = result(RESULT), result(RESULT, SECOND)
+    merged = merge_results([first, second], ["a.txt", "b.txt"])["companies"][0]
+    assert merged.selection_stats.students_selected == 17
+    assert merged.raw_messages == [RESULT, SECOND]
+    # The exports' own records are left as they were
+    assert first["companies"][0].selection_stats.students_selected == 12
+    assert second["companies"][0].raw_messages == [RESULT, SECOND]
+
+
+def test_separate_batches_add_up():
+    merged = merge_results([result(RESULT), result(SECOND)], ["a.txt", "b.txt"])["companies"][0]
+    assert merged.selection_stats.students_selected == 17
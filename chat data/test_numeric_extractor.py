@@ -0,0 +1,50 @@
+import random
+import re
+
+from numeric_extractor import scan_numbers
+
+# The per-line role regex extract_profiles used before the numeric scan
+LEGACY_ROLE_RE = re.compile(r'([a-zA-Z\s0-9()/-]+?)\s*[:-]?\s*(?:inr|rs\.?|₹)?\s*(\d+(?:\.\d+)?)\s*lpa', re.IGNORECASE)
+
+ROLE_CASES = [
+    "Specialist Programmer L3 (Trainee): ₹21 LPA",
+    "Digital Specialist Engineer - 9.5 LPA\nSystems Engineer - 3.6 LPA",
+    "SDE 1 : 12 LPA / SDE 2 : 18 LPA",
+    # An amount with no role of its own still ends the next role's text
+    "12 LPA for SDE 1 / 14 LPA",
+    "CTC 12 LPA, Analyst 8 LPA",
+]
+
+# Amounts have two or more digits: the legacy regex split a one digit amount at
+# the start of a line into its own role, e.g. '3 LPA for 14 LPA' -> '3 LPA for'
+PIECES = ['12', '14.5', '36', ' LPA', ' lpa', 'SDE 1', 'Analyst', ' / ', ': ', ' - ', 'Rs. ', '₹', ' for ',
+          ', ', '\n', '(Trainee)', ' ']
+
+
+def roles(line):
+    # Filtered the way extract_profiles keeps them
+    return [r for r in line if len(r[0]) > 3]
+
+
+def legacy_roles(text):
+    return roles([(role.strip(), float(ctc)) for line in text.split('\n') for role, ctc in LEGACY_ROLE_RE.findall(line)])
+
+
+def scanned_roles(text):
+    return roles([(m.label.strip(), m.value) for m in scan_numbers(text) if m.kind == 'role'])
+
+
+def test_roles_match_the_legacy_regex():
+    for text in ROLE_CASES:
+        assert scanned_roles(text) == legacy_roles(text), text
+
+
+def test_amount_without_role_ends_the_next_role():
+    assert scanned_roles("12 LPA for SDE 1 / 14 LPA") == [("for SDE 1 /", 14.0)]
+
+
+def test_roles_match_the_legacy_regex_on_random_lines():
+    rng = random.Random(0)
+    for _ in range(20000):
+        text = ''.join(rng.choice(PIECES) for _ in range(rng.randint(1, 12)))
+        assert scanned_roles(text) == legacy_roles(text), text
@@ -0,0 +1,55 @@
+import random
+import re
+
+from redact import MESSAGE_RULES, PII_RULES, Redactor, redact_file
+
+# Fragments that combine into headers, phone numbers, emails and the places
+# where they run into each other
+PIECES = ['9876543210', '98765', '43210', '6', '7', '0', '+91', '91', '+', '-', ' ', ' ', '\n',
+          '@', '.', 'gmail', 'com', 'in', 'a', 'x_', 'Call', 'mail']
+HEADER = '27/09/25, 3:28 pm - +91 98043 64389: '
+
+# Cases the single-pass rules once got wrong
+CASES = [
+    'call 91 9876543210@gmail.com',
+    'call +91 98765 43210 now, mail x.9876543210y@abc.in',
+    'a@com.x_@mail.com',
+]
+
+
+def legacy_redact(text):
+    # The email and phone passes clean_message ran before redact.Redactor
+    text = re.sub(r'[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+', '[EMAIL]', text)
+    text = re.sub(r'(?:\+?91[\-\s]?)?[6789]\d{4}[\-\s]?\d{5}', '[PHONE]', text)
+    return re.sub(r'\b[6789]\d{9}\b', '[PHONE]', text)
+
+
+def legacy_clean(msg):
+    msg = re.sub(r'^\d{2}/\d{2}/\d{2}, \d{1,2}:\d{2}\s?(?:am|pm)\s-\s(?:[^:]+): ', '', msg)
+    return legacy_redact(msg).strip()
+
+
+def random_messages(count, seed=0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        text = ''.join(rng.choice(PIECES) for _ in range(rng.randint(1, 30)))
+        yield HEADER + text if rng.random() < 0.3 else text
+
+
+def test_messages_match_the_legacy_passes():
+    redactor = Redactor(MESSAGE_RULES)
+    for msg in CASES + list(random_messages(200000)):
+        assert redactor.redact(msg).strip() == legacy_clean(msg), msg
+
+
+def test_redact_file_matches_the_legacy_passes(tmp_path):
+    text = '\n'.join(HEADER + msg for msg in CASES + list(random_messages(5000, seed=1)))
+    src = tmp_path / 'chat.txt'
+    src.write_text(text, encoding='utf-8')
+    expected = legacy_redact(text)
+    for workers in (1, 2):
+        dst = tmp_path / f'redacted_{workers}.txt'
+        # Small chunks, so the file is split on many message boundaries
+        counts = redact_file(str(src), str(dst), workers=workers, chunk_size=4096, rules=PII_RULES)
+        assert dst.read_text(encoding='utf-8') == expected
+        assert counts['email'] + counts['phone'] > 0
@@ -0,0 +1,36 @@
+import gzip
+import json
+import os
+
+
+class TextStore:
+    """Compressed sidecar store of text extracted from PDFs and DOCX files.
+
+    Pages are stored per file, keyed by the file's content hash, together
+    with whether extraction reached the end of the document. Repeated runs
+    read the pages from here instead of parsing the document again.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.json.gz')
+
+    def load(self, key):
+        """Return (pages, complete), or None if nothing is stored for `key`."""
+        try:
+            with gzip.open(self._path(key), 'rt', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return stored["pages"], stored["complete"]
+
+    def save(self, key, pages, complete):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        # Several worker processes write here at once, so write-then-rename
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+            json.dump({"pages": pages, "complete": complete}, f, ensure_ascii=False)
+        os.replace(tmp, path)
@@ -0,0 +1,160 @@
+import os
+import sys
+import time
+
+from chat_reader import ChatExport
+from extract_data import cached_company, parser_cache
+from group_by_company import ExportGrouper
+from media_resolver import MediaResolver
+from process_media import (MEDIA_ALIASES, MEDIA_DIR, PLACEMENT_FILE, apply_media_result, extract_media_files,
+                           match_media_files, media_cache)
+from publish import Publisher
+
+CHAT_FILE = 'filtered.txt'
+PARSE_CACHE_FILE = 'parse_cache.json'
+POLL_SECONDS = 2
+
+
+def file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def media_stamps(directory):
+    if not os.path.isdir(directory):
+        return {}
+    return {name: file_stamp(os.path.join(directory, name)) for name in os.listdir(directory)}
+
+
+class Watcher:
+    """Keeps the published placement data in step with the chat export and media/.
+
+    Both are polled by size and mtime. When the export has grown past the
+    messages grouped so far, only the new messages are read (through the
+    export's offset index), cleaned and matched, and the companies they add
+    a notice to are marked; any other change to the export groups it again
+    from the start. When media files appear, change or disappear, the
+    companies they resolve to are marked. Only marked companies are parsed
+    and enriched again (through the parse and media caches) and published
+    again, with write-then-rename so readers never see a half-written file.
+    """
+
+    def __init__(self, chat_file=CHAT_FILE, media_dir=MEDIA_DIR, placement_file=PLACEMENT_FILE):
+        self.chat_file = chat_file
+        self.media_dir = media_dir
+        self.placement_file = placement_file
+        self.parse_cache = parser_cache(PARSE_CACHE_FILE)
+        self.media_cache = media_cache()
+        self.publisher = Publisher()
+        self.chat_stamp = None
+        self.media = {}
+        self.grouper = None
+        # Messages of the export grouped so far, and [start, end, digest] of the last one
+        self.read_upto = 0
+        self.last_message = None
+        self.companies = {}
+        self.resolver = None
+        self.resolved_names = None
+        self.media_files = {}
+
+    def appended(self, export, offsets):
+        # Whether the export only grew past the messages grouped so far, with
+        # the last of them unchanged
+        if self.grouper is None or len(offsets) < self.read_upto:
+            return False
+        start, end, digest = self.last_message
+        return offsets[self.read_upto - 1][:2] == [start, end] and export.digest(start, end) == digest
+
+    def refresh_chat(self):
+        with ChatExport(self.chat_file) as export:
+            offsets = export.offsets
+            appended = self.appended(export, offsets)
+            grouper = self.grouper if appended else ExportGrouper()
+            changed = set()
+            for start, end, timestamp in offsets[self.read_upto if appended else 0:]:
+                changed |= grouper.add(export.read(start, end), timestamp)
+            start, end, _ = offsets[-1]
+            self.last_message = [start, end, export.digest(start, end)]
+        self.read_upto = len(offsets)
+
+        if not appended:
+            old = self.grouper.grouped if self.grouper else {}
+            changed = {name for name, messages in grouper.grouped.items() if messages != old.get(name, [])}
+            self.grouper = grouper
+        names = [name for name, messages in grouper.grouped.items() if messages]
+        if names != self.resolved_names:
+            self.resolver = MediaResolver(names, MEDIA_ALIASES)
+            self.resolved_names = names
+        return changed
+
+    def media_by_company(self):
+        # Same files, in the same sorted order, as process_media_files gives each company
+        by_company = {}
+        for filename, name in match_media_files(self.resolver, sorted(self.media))[0]:
+            by_company.setdefault(name, []).append((filename, self.media[filename]))
+        return by_company
+
+    def rebuild(self, name):
+        messages = self.grouper.grouped.get(name)
+        if not messages:
+            self.companies.pop(name, None)
+            return
+        # A fresh record either way; the cache keeps the company as parsed.
+        # The grouper's list keeps growing, so the record gets a copy.
+        company = cached_company(name, list(messages), self.parse_cache)
+        files = [filename for filename, _ in self.media_files.get(name, ())]
+        paths = [os.path.join(self.media_dir, f) for f in files]
+        results = extract_media_files(paths, self.media_cache)
+        for filename, path in zip(files, paths):
+            apply_media_result(company, filename, results[path])
+        self.companies[name] = company
+
+    def poll(self):
+        """Check for changes once; returns the set of companies that were rebuilt."""
+        affected = set()
+        chat_stamp = file_stamp(self.chat_file)
+        if chat_stamp is not None and chat_stamp != self.chat_stamp:
+            self.chat_stamp = chat_stamp
+            affected |= self.refresh_chat()
+
+        media = media_stamps(self.media_dir)
+        if self.resolver and (affected or media != self.media):
+            # New company names can move a file to another company, so the
+            # whole mapping is compared rather than just the changed files
+            self.media = media
+            media_files = self.media_by_company()
+            affected |= {n for n in set(media_files) | set(self.media_files)
+                         if media_files.get(n) != self.media_files.get(n)}
+            self.media_files = media_files
+
+        if not affected:
+            return affected
+        for name in affected:
+            self.rebuild(name)
+        self.parse_cache.save()
+        self.media_cache.save()
+        # Companies in chat order, as a full run lists them
+        data = {"companies": [self.companies[n] for n in self.grouper.grouped if n in self.companies],
+                "unresolved_conflicts": []}
+        self.publisher.publish(data, self.placement_file, changed=affected)
+        return affected
+
+    def run(self, interval=POLL_SECONDS):
+        print(f"Watching {self.chat_file} and {self.media_dir}/ every {interval}s")
+        while True:
+            started = time.perf_counter()
+            affected = self.poll()
+            if affected:
+                print(f"Republished {len(affected)} companies in {time.perf_counter() - started:.2f}s: "
+                      f"{', '.join(sorted(affected))}")
+            time.sleep(interval)
+
+
+if __name__ == "__main__":
+    try:
+        Watcher().run(float(sys.argv[1]) if len(sys.argv) > 1 else POLL_SECONDS)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,71 @@
+import posixpath
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+
+def first_sheet_path(archive):
+    # workbook.xml lists the sheets in tab order; its .rels maps each to a part
+    try:
+        with archive.open('xl/workbook.xml') as f:
+            for _, el in iterparse(f):
+                if el.tag == MAIN_NS + 'sheet':
+                    rel_id = el.get(REL_NS + 'id')
+                    break
+            else:
+                rel_id = None
+        with archive.open('xl/_rels/workbook.xml.rels') as f:
+            for _, el in iterparse(f):
+                if el.tag == PKG_REL_NS + 'Relationship' and el.get('Id') == rel_id:
+                    target = el.get('Target')
+                    if target.startswith('/'):
+                        return target.lstrip('/')
+                    return posixpath.normpath(posixpath.join('xl', target))
+    except KeyError:
+        pass
+    return 'xl/worksheets/sheet1.xml'
+
+
+def cell_has_value(cell):
+    for child in cell:
+        if child.tag == MAIN_NS + 'v' and child.text:
+            return True
+        if child.tag == MAIN_NS + 'is' and ''.join(child.itertext()):
+            return True
+    return False
+
+
+def count_data_rows(path, header_rows=1):
+    """Count the data rows of an .xlsx file's first sheet, as pandas.read_excel would.
+
+    The first `header_rows` rows of the sheet are the header, whether or not
+    they hold anything, like read_excel's default header=0 for one row.
+    Every row after them up to the last row with a value counts, including
+    blank rows in between, which read_excel keeps as empty records. Blank
+    rows after the last value (Excel often leaves formatted ones at the end)
+    don't count.
+
+    The sheet XML is streamed straight out of the archive, one row at a time,
+    so no cell values are kept.
+    """
+    row = last = 0
+    with zipfile.ZipFile(path) as archive:
+        with archive.open(first_sheet_path(archive)) as f:
+            sheet_data = None
+            for event, el in iterparse(f, events=('start', 'end')):
+                if event == 'start':
+                    if el.tag == MAIN_NS + 'sheetData':
+                        sheet_data = el
+                elif el.tag == MAIN_NS + 'row':
+                    # Rows with nothing in them may be left out of the XML
+                    # altogether, so go by the row number where there is one
+                    row = int(el.get('r') or row + 1)
+                    if any(cell_has_value(c) for c in el):
+                        last = row
+                    # Drop finished rows so memory stays flat however long the sheet is
+                    if sheet_data is not None:
+                        sheet_data.remove(el)
+    return max(last - header_rows, 0)
@@ -1,72 +1,11 @@
-import data from './data/placement_data.json';
+import data from './data/placement_index.json';
+import summary from './data/summary.json';
+import searchIndex from './data/search_index.json';
 
 export const getSummaryStats = async () => {
-    // We can simulate an API response if we want, or just return the data directly.
-    // The previous implementation expected summary stats wrapped in an object
-    // Assuming backend generated this, but in frontend we can compute it on the fly 
-    // or just assume frontend components derived it from raw data.
-    // Let's compute a quick summary like the backend did
-    const companies = data.companies;
-    let totalSelections = 0;
-    let highestCtc = 0;
-    let totalCtcSum = 0;
-    let ctcCount = 0;
-    let fullTimeCount = 0;
-    let internshipCount = 0;
-    let ppoCount = 0;
-    const allCtcs = [];
-    const packageDistribution = [];
-
-    companies.forEach(company => {
-        const stats = company.selection_stats || {};
-        const selCount = stats.students_selected || stats.students_shortlisted || 0;
-        totalSelections += selCount;
-
-        const compensation = company.compensation || {};
-        const ctc = compensation.ctc_lpa || 0;
-
-        if (ctc > 0) {
-            if (ctc > highestCtc) highestCtc = ctc;
-            totalCtcSum += ctc;
-            ctcCount++;
-            for (let i = 0; i < selCount; i++) {
-                allCtcs.push(ctc);
-                packageDistribution.push(ctc);
-            }
-        }
-
-        const roles = company.roles || [];
-        const isFTE = roles.some(r => r.engagement_type.includes("Full Time") || r.engagement_type.includes("FTE"));
-        const isIntern = roles.some(r => r.engagement_type.includes("Internship") || r.engagement_type.includes("Intern"));
-        const isPPO = roles.some(r => r.engagement_type.includes("PPO"));
-
-        if (isFTE) fullTimeCount++;
-        if (isIntern) internshipCount++;
-        if (isPPO) ppoCount++;
-    });
-
-    const averageCtc = ctcCount > 0 ? (totalCtcSum / ctcCount).toFixed(2) : 0;
-
-    allCtcs.sort((a, b) => a - b);
-    let medianCtc = 0;
-    if (allCtcs.length > 0) {
-        const mid = Math.floor(allCtcs.length / 2);
-        medianCtc = allCtcs.length % 2 !== 0 ? allCtcs[mid] : ((allCtcs[mid - 1] + allCtcs[mid]) / 2).toFixed(2);
-    }
-
-    return {
-        total_companies_visited: companies.length,
-        total_companies: companies.length,
-        total_selections: totalSelections,
-        total_offers: totalSelections,
-        highest_package_lpa: highestCtc,
-        average_package_lpa: averageCtc,
-        median_package_lpa: medianCtc,
-        full_time_count: fullTimeCount,
-        internship_count: internshipCount,
-        ppo_count: ppoCount,
-        package_distribution: packageDistribution
-    };
+    // Aggregates and the package histogram are precomputed by the Python pipeline
+    // (chat data/summary.py), so there's nothing to derive from the full dataset here.
+    return summary;
 };
 
 export const getCompanies = async () => {
@@ -81,3 +20,74 @@ export const getCompanyByName = async (name) => {
         throw new Error("Company not found");
     }
 };
+
+// Postings point into the companies in published order; the table sorts
+// what it is given, so lookups go through a private copy.
+const indexed = data.companies.slice();
+
+// Inverted index built by the Python pipeline (chat data/search_index.py).
+// Terms are sorted, so every term starting with a prefix sits in one range
+// found by binary search; each posting is a company's position in
+// `indexed`, shifted left, with a bit per field the term occurs in.
+const tokenize = (text) => (text.toLowerCase().match(/[\p{L}\p{N}]+/gu) || []);
+
+const prefixMatches = (prefix, mask) => {
+    const { terms, postings, field_shift: shift } = searchIndex;
+    let lo = 0;
+    let hi = terms.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (terms[mid] < prefix) lo = mid + 1;
+        else hi = mid;
+    }
+    const ids = new Set();
+    for (let i = lo; i < terms.length && terms[i].startsWith(prefix); i++) {
+        for (const posting of postings[i]) {
+            if (posting & mask) ids.add(posting >> shift);
+        }
+    }
+    return ids;
+};
+
+// Companies with a word starting with every word of `query` in one of
+// `fields` ('name', 'role', 'message'), in data order. Synchronous, since
+// the index ships with the bundle.
+export const searchCompanies = (query, fields = Object.keys(searchIndex.fields)) => {
+    const words = tokenize(query);
+    if (words.length === 0) return indexed.slice();
+    const mask = fields.reduce((bits, field) => bits | searchIndex.fields[field], 0);
+
+    let ids = null;
+    for (const word of words) {
+        const matches = prefixMatches(word, mask);
+        ids = ids === null ? matches : new Set([...ids].filter(id => matches.has(id)));
+        if (ids.size === 0) break;
+    }
+    return [...ids].sort((a, b) => a - b).map(id => indexed[id]);
+};
+
+// Raw messages live in a separate store (public/messages) holding each message
+// once, in shards named by the first characters of its id. Shards are fetched
+// only when a company's messages are actually opened.
+const messageShards = {};
+
+const getMessageShard = async (shard) => {
+    if (!messageShards[shard]) {
+        const response = await fetch(`${process.env.PUBLIC_URL}/messages/${shard}.json`);
+        if (!response.ok) throw new Error("Messages not found");
+        messageShards[shard] = await response.json();
+    }
+    return messageShards[shard];
+};
+
+export const getCompanyMessages = async (company) => {
+    const metadata = company.metadata || {};
+    if (metadata.raw_messages) return metadata.raw_messages;
+    const ids = metadata.message_ids || [];
+
+    const shardOf = (id) => id.slice(0, data.message_shard_chars);
+    const shards = [...new Set(ids.map(shardOf))];
+    const loaded = await Promise.all(shards.map(getMessageShard));
+    const texts = Object.assign({}, ...loaded);
+    return ids.map(id => texts[id]).filter(Boolean);
+};
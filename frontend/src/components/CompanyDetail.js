@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useParams, Link } from 'react-router-dom';
-import { getCompanyByName } from '../api';
+import { getCompanyByName, getCompanyMessages } from '../api';
 import { ChevronLeft, ChevronDown, ChevronUp, FileText, IndianRupee, Users, Code, Calendar } from 'lucide-react';
 
 const CompanyDetail = () => {
@@ -8,6 +8,7 @@ const CompanyDetail = () => {
     const [company, setCompany] = useState(null);
     const [loading, setLoading] = useState(true);
     const [showRaw, setShowRaw] = useState(false);
+    const [messages, setMessages] = useState(null);
 
     useEffect(() => {
         const fetchCompany = async () => {
@@ -20,9 +21,23 @@ const CompanyDetail = () => {
                 setLoading(false);
             }
         };
+        setMessages(null);
         fetchCompany();
     }, [name]);
 
+    useEffect(() => {
+        if (!showRaw || !company || messages) return;
+        const fetchMessages = async () => {
+            try {
+                setMessages(await getCompanyMessages(company));
+            } catch (error) {
+                console.error("Failed to fetch messages:", error);
+                setMessages([]);
+            }
+        };
+        fetchMessages();
+    }, [showRaw, company, messages]);
+
     if (loading) return (
         <div className="flex justify-center items-center h-64">
             <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-indigo-500"></div>
@@ -240,7 +255,7 @@ const CompanyDetail = () => {
                         <FileText className="w-5 h-5 text-slate-500 mr-2" />
                         <h3 className="text-lg font-semibold text-slate-900 dark:text-white">Original Announcements & Messages</h3>
                         <span className="ml-3 inline-flex items-center px-2 py-0.5 rounded text-xs font-medium bg-slate-200 text-slate-800 dark:bg-slate-700 dark:text-slate-300">
-                            {company.metadata?.raw_messages?.length || 0} messages
+                            {company.metadata?.message_ids?.length || company.metadata?.raw_messages?.length || 0} messages
                         </span>
                     </div>
                     {showRaw ? <ChevronUp className="w-5 h-5 text-slate-500" /> : <ChevronDown className="w-5 h-5 text-slate-500" />}
@@ -249,8 +264,10 @@ const CompanyDetail = () => {
                 {showRaw && (
                     <div className="p-6 border-t border-slate-200 dark:border-slate-700">
                         <div className="space-y-4">
-                            {company.metadata?.raw_messages && company.metadata.raw_messages.length > 0 ? (
-                                company.metadata.raw_messages.map((msg, idx) => (
+                            {!messages ? (
+                                <p className="text-slate-500 text-sm">Loading messages...</p>
+                            ) : messages.length > 0 ? (
+                                messages.map((msg, idx) => (
                                     <div key={idx} className="bg-slate-50 dark:bg-slate-900 rounded-lg p-4 border border-slate-200 dark:border-slate-700">
                                         <pre className="text-xs text-slate-700 dark:text-slate-300 font-mono whitespace-pre-wrap break-words">
                                             {msg}
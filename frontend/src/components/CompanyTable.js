@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
-import { getCompanies } from '../api';
+import { getCompanies, searchCompanies } from '../api';
 import { Search, ChevronUp, ChevronDown } from 'lucide-react';
 
 const CompanyTable = () => {
@@ -34,8 +34,9 @@ const CompanyTable = () => {
     useEffect(() => {
         let result = companies;
 
+        // Name, role and message search go through the precomputed index
         if (searchTerm) {
-            result = result.filter(c => c.company_name.toLowerCase().includes(searchTerm.toLowerCase()));
+            result = searchCompanies(searchTerm);
         }
 
         if (engagementFilter) {
@@ -43,11 +44,12 @@ const CompanyTable = () => {
         }
 
         if (roleFilter) {
-            result = result.filter(c => c.role && c.role.some(r => r.toLowerCase().includes(roleFilter.toLowerCase())));
+            const withRole = new Set(searchCompanies(roleFilter, ['role']));
+            result = result.filter(c => withRole.has(c));
         }
 
-        // Sorting
-        result.sort((a, b) => {
+        // Sorting, on a copy so the fetched list keeps its order
+        result = [...result].sort((a, b) => {
             let valA, valB;
 
             switch (sortField) {
@@ -73,7 +75,7 @@ const CompanyTable = () => {
             return 0;
         });
 
-        setFiltered([...result]);
+        setFiltered(result);
     }, [companies, searchTerm, engagementFilter, roleFilter, sortField, sortDirection]);
 
     const toggleSort = (field) => {
@@ -114,7 +116,7 @@ const CompanyTable = () => {
                         </div>
                         <input
                             type="text"
-                            placeholder="Search companies..."
+                            placeholder="Search companies, roles, messages..."
                             className="block w-full pl-10 pr-3 py-2 border border-slate-300 dark:border-slate-600 rounded-md leading-5 bg-slate-50 dark:bg-slate-700 text-slate-900 dark:text-white placeholder-slate-500 focus:outline-none focus:ring-1 focus:ring-indigo-500 focus:border-indigo-500 sm:text-sm"
                             value={searchTerm}
                             onChange={(e) => setSearchTerm(e.target.value)}
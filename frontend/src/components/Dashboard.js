@@ -59,25 +59,8 @@ const Dashboard = () => {
         { name: 'PPO', value: stats.ppo_count || 0 }
     ].filter(d => d.value > 0);
 
-    // Group packages into ranges
-    const distribution = {};
-    stats.package_distribution.forEach(pack => {
-        let range = '';
-        if (pack < 5) range = '< 5 LPA';
-        else if (pack < 10) range = '5 - 10 LPA';
-        else if (pack < 20) range = '10 - 20 LPA';
-        else range = '20+ LPA';
-
-        distribution[range] = (distribution[range] || 0) + 1;
-    });
-
-    const chartData = Object.keys(distribution).map(key => ({
-        range: key,
-        count: distribution[key]
-    })).sort((a, b) => {
-        const order = { '< 5 LPA': 1, '5 - 10 LPA': 2, '10 - 20 LPA': 3, '20+ LPA': 4 };
-        return order[a.range] - order[b.range];
-    });
+    // Packages are already grouped into ranges by the pipeline
+    const chartData = stats.package_histogram || [];
 
     return (
         <div className="space-y-8 animate-in fade-in duration-500">